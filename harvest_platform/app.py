@@ -2,8 +2,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import json
 import os
+import io
+import asyncio
 
 # Set page config first
 st.set_page_config(
@@ -18,11 +19,112 @@ from core.db import DatabaseManager
 from core.scheduler import HarvestScheduler
 from core.scoring import LeadScorer
 from utils.export import DataExporter
+from utils import fast_json
 
-# Initialize session state
-if 'engine' not in st.session_state:
-    st.session_state.engine = HarvestEngine()
-    st.session_state.db = DatabaseManager()
+SOURCE_COLS = ('ID', 'Name', 'enabled', 'Leads', 'Runs', 'successful')
+LEAD_COLS = ('business_name', 'city', 'state', 'phone', 'email', 'website', 'score', 'scraped_at')
+STATUS_LABELS = {'success': '✅ Success', 'failed': '❌ Failed', 'started': '🔄 Running'}
+LOG_COLS = ('started_at', 'source_name', 'status', 'leads_scraped', 'completed_at', 'error_message')
+# download_button needs the whole file in memory, so exports stay capped at the newest N leads
+EXPORT_ROW_LIMIT = 10000
+DEFAULT_SELECTORS_JSON = fast_json.dumps({
+    "listing_container": ".listing",
+    "business_name": ".name",
+    "phone": ".phone",
+    "email": ".email",
+    "website": "a.website",
+    "address": ".address",
+    "city": ".city",
+    "state": ".state"
+}, indent=True)
+
+
+def page_slice(items: list, page_size: int, key: str) -> list:
+    """Render a page picker and return only the items on the selected page"""
+    pages = max(1, -(-len(items) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    start = (page - 1) * page_size
+    return items[start:start + page_size]
+
+
+@st.cache_resource
+def install_event_loop_policy() -> bool:
+    """Switch asyncio to uvloop once per process, not on every rerun; False if it isn't installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+@st.cache_resource
+def get_engine() -> HarvestEngine:
+    """One engine per process, shared by every browser session.
+    
+    Page parsing stays in the scraping threads unless HARVEST_PARSE_WORKERS
+    asks for a process pool.
+    """
+    return HarvestEngine(parse_workers=int(os.environ.get('HARVEST_PARSE_WORKERS', 0)))
+
+
+@st.cache_resource
+def get_db() -> DatabaseManager:
+    """Process-wide database manager"""
+    return DatabaseManager()
+
+
+@st.cache_resource
+def get_scheduler() -> HarvestScheduler:
+    """Process-wide scheduler, started on first use"""
+    scheduler = HarvestScheduler(get_engine())
+    scheduler.start()
+    return scheduler
+
+
+install_event_loop_policy()
+engine = get_engine()
+db = get_db()
+
+
+def db_version() -> int:
+    """Cache key that changes whenever the database is written"""
+    return db.get_version()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_stats(version: int) -> dict:
+    """Platform stats, recomputed only when the database version changes"""
+    return engine.get_stats()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_sources_df(version: int) -> pd.DataFrame:
+    """Dashboard source overview table, rebuilt only when the database version changes"""
+    df = pd.DataFrame.from_records(
+        [
+            (s['id'], s['name'], s['enabled'], s['leads'],
+             s['scrape_stats'].get('total_runs') or 0,
+             s['scrape_stats'].get('successful') or 0)
+            for s in cached_stats(version)['sources']
+        ],
+        columns=SOURCE_COLS
+    )
+    df['Status'] = df['enabled'].astype(bool).map({True: '✅ Enabled', False: '❌ Disabled'})
+    df['Success Rate'] = (df['successful'] / df['Runs'].clip(lower=1) * 100).round(1)
+    return df
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_sources(version: int, enabled_only: bool) -> list:
+    """Source configurations, memoized per database version"""
+    return db.load_sources(enabled_only=enabled_only)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_recent_logs(version: int, limit: int) -> list:
+    """Recent scrape logs, memoized per database version"""
+    return db.get_recent_logs(limit=limit)
 
 # Sidebar navigation
 st.sidebar.title("🌾 Harvest Platform")
@@ -35,7 +137,7 @@ page = st.sidebar.radio(
 if page == "📊 Dashboard":
     st.title("📊 Dashboard")
     
-    stats = st.session_state.engine.get_stats()
+    stats = cached_stats(db_version())
     
     col1, col2, col3 = st.columns(3)
     
@@ -55,19 +157,14 @@ if page == "📊 Dashboard":
     st.subheader("📈 Source Overview")
     
     if stats['sources']:
-        df_sources = pd.DataFrame([
-            {
-                'ID': s['id'],
-                'Name': s['name'],
-                'Status': '✅ Enabled' if s['enabled'] else '❌ Disabled',
-                'Leads': s['leads'],
-                'Runs': s['scrape_stats'].get('total_runs', 0),
-                'Success Rate': f"{(s['scrape_stats'].get('successful', 0) / max(s['scrape_stats'].get('total_runs', 1), 1) * 100):.1f}%"
-            }
-            for s in stats['sources']
-        ])
+        df_sources = cached_sources_df(db_version())
         
-        st.dataframe(df_sources, use_container_width=True, hide_index=True)
+        st.dataframe(
+            df_sources[['ID', 'Name', 'Status', 'Leads', 'Runs', 'Success Rate']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={'Success Rate': st.column_config.NumberColumn(format="%.1f%%")}
+        )
     else:
         st.info("No sources configured yet. Go to Settings to add sources.")
 
@@ -75,7 +172,7 @@ if page == "📊 Dashboard":
 elif page == "🔄 Scraper":
     st.title("🔄 Run Scraper")
     
-    sources = st.session_state.db.load_sources(enabled_only=True)
+    sources = cached_sources(db_version(), enabled_only=True)
     
     if not sources:
         st.warning("⚠️ No enabled sources. Enable sources in Settings first.")
@@ -98,10 +195,10 @@ elif page == "🔄 Scraper":
             status_text.text(f"Starting scrape for {selected_source}...")
             progress_bar.progress(25)
             
-            result = st.session_state.engine.run_scraper(
-                source_id, 
+            result = asyncio.run(engine.arun_scrapers(
+                [source_id],
                 max_leads=max_leads if max_leads > 0 else None
-            )
+            ))[0]
             
             progress_bar.progress(100)
             
@@ -127,10 +224,10 @@ elif page == "📋 Leads":
     tab1, tab2 = st.tabs(["🔍 Browse", "📥 Export"])
     
     with tab1:
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            sources = st.session_state.db.load_sources(enabled_only=False)
+            sources = cached_sources(db_version(), enabled_only=False)
             source_filter = st.selectbox(
                 "Filter by Source",
                 ["All Sources"] + [s['name'] for s in sources]
@@ -142,33 +239,43 @@ elif page == "📋 Leads":
         with col3:
             limit = st.number_input("Results per page", min_value=10, max_value=1000, value=100)
         
+        with col4:
+            page_num = st.number_input("Page", min_value=1, value=1, step=1)
+        
         source_id = None
         if source_filter != "All Sources":
             source_id = next(s['id'] for s in sources if s['name'] == source_filter)
         
-        leads = st.session_state.db.get_leads(
+        if st.button("🔄 Recalculate Scores"):
+            with st.spinner("Rescoring leads..."):
+                updated = engine.rescore_leads(source_id=source_id)
+            st.success(f"Updated {updated} lead scores")
+        
+        offset = (page_num - 1) * limit
+        leads = db.get_leads_summary(
             source_id=source_id,
             limit=limit,
-            min_score=min_score if min_score > 0 else None
+            offset=offset,
+            min_score=min_score if min_score > 0 else None,
+            columns=LEAD_COLS
         )
         
         if leads:
-            st.success(f"Found {len(leads)} leads")
+            st.success(f"Showing leads {offset + 1}-{offset + len(leads)}")
+            
+            raw = pd.DataFrame.from_records(leads, columns=LEAD_COLS)
             
-            df_leads = pd.DataFrame([
-                {
-                    'Business': lead['business_name'],
-                    'City': lead.get('city', 'N/A'),
-                    'State': lead.get('state', 'N/A'),
-                    'Phone': lead.get('phone', 'N/A'),
-                    'Email': lead.get('email', 'N/A'),
-                    'Website': lead.get('website', 'N/A'),
-                    'Score': lead.get('score', 0),
-                    'Quality': LeadScorer.classify_lead(lead.get('score', 0)),
-                    'Scraped': str(lead.get('scraped_at', ''))[:10]
-                }
-                for lead in leads
-            ])
+            df_leads = pd.DataFrame({
+                'Business': raw['business_name'],
+                'City': raw['city'],
+                'State': raw['state'].astype('category'),
+                'Phone': raw['phone'],
+                'Email': raw['email'],
+                'Website': raw['website'],
+                'Score': raw['score'].fillna(0).astype(int),
+                'Quality': raw['score'].fillna(0).map(LeadScorer.classify_lead).astype('category'),
+                'Scraped': raw['scraped_at'].astype(str).str[:10]
+            })
             
             st.dataframe(df_leads, use_container_width=True, hide_index=True)
         else:
@@ -181,32 +288,42 @@ elif page == "📋 Leads":
         include_metadata = st.checkbox("Include metadata")
         
         if st.button("Generate Export"):
-            leads = st.session_state.db.get_leads(limit=10000)
-            
-            if not leads:
+            total_leads = db.count_leads()
+            if total_leads == 0:
                 st.warning("No leads to export")
             else:
+                if total_leads > EXPORT_ROW_LIMIT:
+                    st.info(f"Exporting the newest {EXPORT_ROW_LIMIT:,} of {total_leads:,} leads")
+                
                 if export_format == "CSV":
-                    csv_data = DataExporter.to_csv(leads, include_metadata)
+                    csv_buffer = io.BytesIO()
+                    for chunk in DataExporter.to_csv_stream(
+                            db.iter_leads(include_metadata=include_metadata, limit=EXPORT_ROW_LIMIT),
+                            include_metadata):
+                        csv_buffer.write(chunk)
+                    csv_buffer.seek(0)
                     st.download_button(
                         "💾 Download CSV",
-                        csv_data,
+                        csv_buffer,
                         file_name=f"harvest_leads_{datetime.now().strftime('%Y%m%d')}.csv",
                         mime="text/csv"
                     )
                 
                 elif export_format == "JSON":
-                    json_data = DataExporter.to_json(leads)
+                    json_buffer = io.BytesIO()
+                    for chunk in DataExporter.to_json_stream(db.iter_leads(limit=EXPORT_ROW_LIMIT)):
+                        json_buffer.write(chunk)
+                    json_buffer.seek(0)
                     st.download_button(
                         "💾 Download JSON",
-                        json_data,
+                        json_buffer,
                         file_name=f"harvest_leads_{datetime.now().strftime('%Y%m%d')}.json",
                         mime="application/json"
                     )
                 
                 elif export_format == "Excel":
                     try:
-                        excel_buffer = DataExporter.to_excel_buffer(leads)
+                        excel_buffer = DataExporter.to_excel_buffer(db.iter_leads(include_metadata=False, limit=EXPORT_ROW_LIMIT))
                         st.download_button(
                             "💾 Download Excel",
                             excel_buffer,
@@ -223,7 +340,7 @@ elif page == "⚙️ Settings":
     tab1, tab2 = st.tabs(["📝 Sources", "➕ Add Source"])
     
     with tab1:
-        sources = st.session_state.db.load_sources(enabled_only=False)
+        sources = cached_sources(db_version(), enabled_only=False)
         
         for source in sources:
             with st.expander(f"{'✅' if source['enabled'] else '❌'} {source['name']}", expanded=False):
@@ -239,12 +356,12 @@ elif page == "⚙️ Settings":
                     enabled = st.checkbox("Enabled", value=source['enabled'], key=f"enabled_{source['id']}")
                     
                     if st.button("💾 Save Changes", key=f"save_{source['id']}"):
-                        st.session_state.db.update_source(source['id'], {'enabled': enabled})
+                        db.update_source(source['id'], {'enabled': enabled})
                         st.success("✅ Source updated!")
                         st.rerun()
                     
                     if st.button("🗑️ Delete Source", key=f"delete_{source['id']}"):
-                        st.session_state.db.delete_source(source['id'])
+                        db.delete_source(source['id'])
                         st.success("✅ Source deleted!")
                         st.rerun()
                 
@@ -262,16 +379,7 @@ elif page == "⚙️ Settings":
             st.text("Selectors (JSON format):")
             selectors_json = st.text_area(
                 "Selectors",
-                value=json.dumps({
-                    "listing_container": ".listing",
-                    "business_name": ".name",
-                    "phone": ".phone",
-                    "email": ".email",
-                    "website": "a.website",
-                    "address": ".address",
-                    "city": ".city",
-                    "state": ".state"
-                }, indent=2),
+                value=DEFAULT_SELECTORS_JSON,
                 height=200
             )
             
@@ -282,7 +390,7 @@ elif page == "⚙️ Settings":
                     st.error("Please fill in all required fields (*)")
                 else:
                     try:
-                        selectors = json.loads(selectors_json)
+                        selectors = fast_json.loads(selectors_json)
                         
                         new_source = {
                             'name': name,
@@ -294,11 +402,11 @@ elif page == "⚙️ Settings":
                             'enabled': True
                         }
                         
-                        st.session_state.db.add_source(new_source)
+                        db.add_source(new_source)
                         st.success(f"✅ Source '{name}' added successfully!")
                         st.rerun()
                     
-                    except json.JSONDecodeError:
+                    except fast_json.JSONDecodeError:
                         st.error("Invalid JSON in selectors field")
                     except Exception as e:
                         st.error(f"Error adding source: {e}")
@@ -308,14 +416,12 @@ elif page == "📅 Scheduler":
     st.title("📅 Scheduled Jobs")
     st.info("⚠️ Scheduler feature requires the app to run continuously. Jobs will be lost on restart.")
     
-    if 'scheduler' not in st.session_state:
-        st.session_state.scheduler = HarvestScheduler(st.session_state.engine)
-        st.session_state.scheduler.start()
+    scheduler = get_scheduler()
     
     tab1, tab2 = st.tabs(["📋 Active Jobs", "➕ Add Job"])
     
     with tab1:
-        jobs = st.session_state.scheduler.get_jobs()
+        jobs = scheduler.get_jobs()
         
         if jobs:
             for job_id, job_info in jobs.items():
@@ -325,14 +431,14 @@ elif page == "📅 Scheduler":
                     st.write(f"**Next Run:** {job_info.get('next_run', 'N/A')}")
                     
                     if st.button("🗑️ Remove Job", key=f"remove_{job_id}"):
-                        st.session_state.scheduler.remove_job(job_id)
+                        scheduler.remove_job(job_id)
                         st.success("Job removed!")
                         st.rerun()
         else:
             st.info("No scheduled jobs. Add one in the 'Add Job' tab.")
     
     with tab2:
-        sources = st.session_state.db.load_sources(enabled_only=True)
+        sources = cached_sources(db_version(), enabled_only=True)
         
         if not sources:
             st.warning("No enabled sources available")
@@ -347,7 +453,7 @@ elif page == "📅 Scheduler":
                 
                 if st.button("Add Daily Job"):
                     source_id = source_options[selected_source]
-                    job_id = st.session_state.scheduler.add_daily_job(source_id, time_str)
+                    job_id = scheduler.add_daily_job(source_id, time_str)
                     st.success(f"✅ Daily job created: {job_id}")
             
             elif schedule_type == "Interval (hours)":
@@ -355,7 +461,7 @@ elif page == "📅 Scheduler":
                 
                 if st.button("Add Interval Job"):
                     source_id = source_options[selected_source]
-                    job_id = st.session_state.scheduler.add_interval_job(source_id, hours)
+                    job_id = scheduler.add_interval_job(source_id, hours)
                     st.success(f"✅ Interval job created: {job_id}")
             
             else:  # Weekly
@@ -364,27 +470,27 @@ elif page == "📅 Scheduler":
                 
                 if st.button("Add Weekly Job"):
                     source_id = source_options[selected_source]
-                    job_id = st.session_state.scheduler.add_weekly_job(source_id, day, time_str)
+                    job_id = scheduler.add_weekly_job(source_id, day, time_str)
                     st.success(f"✅ Weekly job created: {job_id}")
 
 # ===== LOGS PAGE =====
 elif page == "📜 Logs":
     st.title("📜 Scraping Logs")
     
-    logs = st.session_state.db.get_recent_logs(limit=100)
+    logs = cached_recent_logs(db_version(), limit=100)
     
     if logs:
-        df_logs = pd.DataFrame([
-            {
-                'Time': str(log['started_at'])[:19],
-                'Source': log['source_name'],
-                'Status': '✅ Success' if log['status'] == 'success' else '❌ Failed' if log['status'] == 'failed' else '🔄 Running',
-                'Leads': log['leads_scraped'],
-                'Duration': str(log.get('completed_at', ''))[:19] if log.get('completed_at') else 'Running...',
-                'Error': log.get('error_message', '')[:50] if log.get('error_message') else ''
-            }
-            for log in logs
-        ])
+        page_logs = page_slice(logs, 25, key="logs_page")
+        raw = pd.DataFrame.from_records(page_logs, columns=LOG_COLS)
+        
+        df_logs = pd.DataFrame({
+            'Time': raw['started_at'].astype(str).str[:19],
+            'Source': raw['source_name'].astype('category'),
+            'Status': raw['status'].map(STATUS_LABELS).fillna('🔄 Running').astype('category'),
+            'Leads': raw['leads_scraped'],
+            'Duration': raw['completed_at'].fillna('Running...').astype(str).str[:19],
+            'Error': raw['error_message'].fillna('').astype(str).str[:50]
+        })
         
         st.dataframe(df_logs, use_container_width=True, hide_index=True)
     else:
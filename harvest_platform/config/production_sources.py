@@ -1,6 +1,8 @@
 """Production-ready source configurations"""
 
-PRODUCTION_SOURCES = [
+from types import MappingProxyType
+
+_RAW_SOURCES = [
     {
         "name": "Yellow Pages US",
         "source_type": "example_direct",
@@ -158,3 +160,9 @@ PRODUCTION_SOURCES = [
         "enabled": False
     }
 ]
+
+# Read-only views; copy to a dict before persisting or modifying
+PRODUCTION_SOURCES = tuple(
+    MappingProxyType({**source, 'selectors': MappingProxyType(source['selectors'])})
+    for source in _RAW_SOURCES
+)
@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Generator
+from typing import Callable, Dict, Iterator, List, Optional, Generator, Union
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from bs4.builder import builder_registry
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import logging
+import re
+import threading
 
 import sys
 import os
@@ -14,10 +19,34 @@ from utils.anti_detection import AntiDetection
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+_PHONE_RE = re.compile(r'\+?\d[\d\-().\s]{7,}')
+
+# BeautifulSoup tree builder for scraped pages: libxml2-backed lxml when installed
+HTML_PARSER = 'lxml' if builder_registry.lookup('lxml') else 'html.parser'
+
+
+class CachedResponse:
+    """Reply to a conditional GET that came back 304, carrying the cached body.
+    
+    status_code stays 304 and from_cache is True, so callers can tell it
+    from a fresh download; content is the body stored with the validators.
+    """
+    from_cache = True
+    
+    def __init__(self, response: requests.Response, body: bytes):
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = body
+
 
 class BaseScraper(ABC):
     """Abstract base class for all scrapers"""
     
+    _SHARED_SESSION: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    
     def __init__(self, config: Dict):
         """Initialize scraper with configuration"""
         self.config = config
@@ -27,10 +56,25 @@ class BaseScraper(ABC):
         self.selectors = config['selectors']
         self.rate_limit_delay = config.get('rate_limit_delay', 3.0)
         self.proxy_config = config.get('proxy_config')
-        self.session = self._create_session()
+        self.concurrency = max(1, int(config.get('concurrency', 4)))
+        self.session = BaseScraper._shared_session()
+        self.http_cache = None  # optional DatabaseManager for conditional GETs
+        self.parse_pool = None  # optional process pool for page parsing
+        # Set when the scrape is over so fetch_many() threads send nothing more
+        self._stopped = threading.Event()
         self.logger = logger
     
-    def _create_session(self) -> requests.Session:
+    @classmethod
+    def _shared_session(cls) -> requests.Session:
+        """Process-wide session so pooled connections survive across scrapers and runs"""
+        if BaseScraper._SHARED_SESSION is None:
+            with BaseScraper._session_lock:
+                if BaseScraper._SHARED_SESSION is None:
+                    BaseScraper._SHARED_SESSION = cls._create_session()
+        return BaseScraper._SHARED_SESSION
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
         """Create requests session with retry logic"""
         session = requests.Session()
         
@@ -41,15 +85,19 @@ class BaseScraper(ABC):
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100,
+                              max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         
         return session
     
     def _make_request(self, url: str, method: str = "GET", 
-                     **kwargs) -> Optional[requests.Response]:
-        """Make HTTP request with anti-detection measures"""
+                     **kwargs) -> Optional[Union[requests.Response, CachedResponse]]:
+        """Make HTTP request with anti-detection measures.
+        
+        A 304 to a conditional GET returns a CachedResponse with the stored body.
+        """
         try:
             headers = AntiDetection.get_headers(referer=kwargs.pop('referer', None))
             headers.update(kwargs.pop('headers', {}))
@@ -61,6 +109,16 @@ class BaseScraper(ABC):
                     'https': self.proxy_config.get('https')
                 }
             
+            cacheable = self.http_cache is not None and method == "GET" and 'params' not in kwargs
+            cached = self.http_cache.get_http_cache(url) if cacheable else None
+            if cached:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            AntiDetection.throttle(urlparse(url).netloc, self.rate_limit_delay)
+            
             response = self.session.request(
                 method=method,
                 url=url,
@@ -69,9 +127,18 @@ class BaseScraper(ABC):
                 timeout=30,
                 **kwargs
             )
+            
+            if cached and response.status_code == 304:
+                logger.info(f"Not modified, using cached body: {url}")
+                return CachedResponse(response, cached['body'])
+            
             response.raise_for_status()
             
-            AntiDetection.smart_sleep(self.rate_limit_delay)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if cacheable and (etag or last_modified):
+                self.http_cache.save_http_cache(url, etag, last_modified, response.content,
+                                               source_id=self.source_id)
             
             return response
             
@@ -79,6 +146,45 @@ class BaseScraper(ABC):
             logger.error(f"Request failed for {url}: {str(e)}")
             return None
     
+    def fetch_many(self, urls: List[str],
+                   fetch: Optional[Callable[[str], Optional[requests.Response]]] = None
+                   ) -> Iterator[Optional[requests.Response]]:
+        """Fetch URLs on up to ``concurrency`` threads, yielding responses in input order.
+        
+        Later pages download while the caller handles earlier ones. Closing
+        the iterator, or cleanup(), cancels fetches that haven't started and
+        stops those that check ``_stopped`` before sending.
+        """
+        fetch = fetch or self._make_request
+        
+        def run(url):
+            return None if self._stopped.is_set() else fetch(url)
+        
+        self._stopped.clear()
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(urls))))
+        futures = []
+        try:
+            for url in urls:
+                futures.append(pool.submit(run, url))
+            for future in futures:
+                yield future.result()
+        finally:
+            self._stopped.set()
+            # cancel_futures= needs 3.9; queued fetches are cancelled by hand
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    def _parse_page(self, parse_fn, *args):
+        """Run a module-level page parser, in the parse pool if one is attached.
+        
+        Parsing holds the GIL, so a process pool keeps concurrent sources
+        from serializing on each other's HTML parsing.
+        """
+        if self.parse_pool is None:
+            return parse_fn(*args)
+        return self.parse_pool.submit(parse_fn, *args).result()
+    
     @abstractmethod
     def scrape(self) -> Generator[Dict, None, None]:
         """Main scraping logic - must be implemented by subclasses"""
@@ -94,12 +200,18 @@ class BaseScraper(ABC):
         if not lead.get('business_name'):
             return False
         
-        if not any([lead.get('phone'), lead.get('email'), lead.get('website')]):
-            return False
-        
-        return True
+        # Cheapest check first; each clause is only evaluated if the previous one fails
+        phone = lead.get('phone')
+        if phone and _PHONE_RE.search(phone):
+            return True
+        email = lead.get('email')
+        if email and _EMAIL_RE.search(email):
+            return True
+        return bool(lead.get('website'))
     
     def cleanup(self):
         """Cleanup resources"""
-        if hasattr(self, 'session'):
+        # The engine may stop consuming scrape() without closing it
+        self._stopped.set()
+        if hasattr(self, 'session') and self.session is not BaseScraper._SHARED_SESSION:
             self.session.close()
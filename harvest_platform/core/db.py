@@ -1,9 +1,52 @@
 import sqlite3
-import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import hashlib
+import itertools
+import re
+import zlib
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple
 from contextlib import contextmanager
+from pathlib import Path
+import atexit
 import threading
+import weakref
+
+from utils import fast_json
+
+# SQLite 3.45+ can store JSON in its binary JSONB form; older builds keep TEXT
+HAS_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Cached page bodies kept for conditional GETs; the least recently saved go first,
+# checked once every HTTP_CACHE_EVICT_EVERY saves rather than on each one
+HTTP_CACHE_MAX_ENTRIES = 5000
+HTTP_CACHE_EVICT_EVERY = 100
+
+
+def _sqlite_has_fts5() -> bool:
+    """Whether the linked SQLite library was built with FTS5"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        return any(row[0] == 'ENABLE_FTS5' for row in conn.execute("PRAGMA compile_options"))
+    finally:
+        conn.close()
+
+
+HAS_FTS5 = _sqlite_has_fts5()
+
+
+class _ThreadConnections:
+    """Connections owned by one thread; released with the thread or by close_all"""
+    
+    def __init__(self):
+        self.conns: Dict[bool, sqlite3.Connection] = {}
+        self.read_depth = 0  # readonly get_connection blocks currently open
+    
+    def close(self):
+        for conn in self.conns.values():
+            conn.close()
+        self.conns.clear()
+
 
 class DatabaseManager:
     """Thread-safe SQLite manager optimized for low-memory environments"""
@@ -21,22 +64,169 @@ class DatabaseManager:
     def __init__(self, db_path: str = "harvest.db"):
         if not hasattr(self, 'initialized'):
             self.db_path = db_path
+            self._http_cache_saves = itertools.count(1)
+            self._tls = threading.local()
+            self._thread_conns = weakref.WeakSet()
+            self._thread_conns_lock = threading.Lock()
             self.initialized = True
             self._init_db()
+            atexit.register(self.close_all)
     
-    @contextmanager
-    def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+    # Connection-scoped settings; journal_mode=WAL is persisted in the file by _init_db
+    _CONNECTION_PRAGMAS = (
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA foreign_keys=ON",
+    )
+    
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection in autocommit mode; transactions are begun explicitly"""
+        if readonly:
+            # mode=ro never takes the write lock and cannot modify the file
+            target, uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro", True
+        else:
+            target, uri = self.db_path, False
+        conn = sqlite3.connect(target, uri=uri, check_same_thread=False, isolation_level=None)
         conn.row_factory = sqlite3.Row
+        for pragma in self._CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _thread_connection(self, readonly: bool = False) -> sqlite3.Connection:
+        """This thread's cached read-only or read-write connection"""
+        owned = getattr(self._tls, 'owned', None)
+        if owned is None:
+            owned = self._tls.owned = _ThreadConnections()
+            with self._thread_conns_lock:
+                self._thread_conns.add(owned)
+        conn = owned.conns.get(readonly)
+        if conn is None:
+            conn = owned.conns[readonly] = self._connect(readonly)
+        return conn
+    
+    def close_all(self):
+        """Close every cached connection; threads reopen on next use"""
+        with self._thread_conns_lock:
+            owned_by_threads = list(self._thread_conns)
+        for owned in owned_by_threads:
+            owned.close()
+    
+    @contextmanager
+    def get_connection(self, immediate: bool = False, readonly: bool = False):
+        """Context manager for this thread's connection, one transaction per block.
+        
+        immediate=True takes the write lock up front, so a writer waits on
+        busy_timeout instead of failing to upgrade a read transaction.
+        readonly=True uses a separate mode=ro connection. A write block opened
+        while the connection is already in a transaction joins it; a readonly
+        block only joins an enclosing readonly block, never a stale snapshot.
+        """
+        conn = self._thread_connection(readonly)
+        if readonly:
+            owned = self._tls.owned
+            if owned.read_depth:
+                owned.read_depth += 1
+                try:
+                    yield conn
+                finally:
+                    owned.read_depth -= 1
+                return
+            if conn.in_transaction:
+                # Left open by an abandoned block; start from a fresh snapshot
+                conn.execute("ROLLBACK")
+        elif conn.in_transaction:
+            yield conn
+            return
+        
+        if readonly:
+            owned.read_depth += 1
         try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
             yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
+            conn.execute("COMMIT")
+        except BaseException:
+            # BaseException too: a closed generator must not leave a cached
+            # connection stuck in a transaction
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
         finally:
-            conn.close()
+            if readonly:
+                owned.read_depth -= 1
+    
+    # Lead storage, deduplicated on an 8-byte hash of name, city and phone
+    _LEADS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id INTEGER NOT NULL,
+        business_name TEXT NOT NULL,
+        city TEXT,
+        state TEXT,
+        phone TEXT,
+        email TEXT,
+        website TEXT,
+        address TEXT,
+        category TEXT,
+        metadata TEXT,
+        score INTEGER DEFAULT 0,
+        scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        dedup_hash BLOB UNIQUE,
+        FOREIGN KEY (source_id) REFERENCES sources(id) ON DELETE CASCADE
+    );
+    """
+    
+    # Scraping audit logs
+    _SCRAPER_LOGS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        leads_scraped INTEGER DEFAULT 0,
+        error_message TEXT,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES sources(id) ON DELETE CASCADE
+    );
+    """
+    
+    # Scheduled jobs
+    _SCHEDULED_JOBS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT UNIQUE NOT NULL,
+        source_id INTEGER NOT NULL,
+        schedule_type TEXT NOT NULL,
+        schedule_config TEXT NOT NULL,
+        max_leads INTEGER,
+        enabled BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES sources(id) ON DELETE CASCADE
+    );
+    """
+    
+    # Full-text index over leads, kept in sync by triggers
+    _LEADS_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+        business_name, address, category, content='leads', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS leads_ai AFTER INSERT ON leads BEGIN
+        INSERT INTO leads_fts(rowid, business_name, address, category)
+        VALUES (new.id, new.business_name, new.address, new.category);
+    END;
+    CREATE TRIGGER IF NOT EXISTS leads_ad AFTER DELETE ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, business_name, address, category)
+        VALUES ('delete', old.id, old.business_name, old.address, old.category);
+    END;
+    CREATE TRIGGER IF NOT EXISTS leads_au AFTER UPDATE OF business_name, address, category ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, business_name, address, category)
+        VALUES ('delete', old.id, old.business_name, old.address, old.category);
+        INSERT INTO leads_fts(rowid, business_name, address, category)
+        VALUES (new.id, new.business_name, new.address, new.category);
+    END;
+    """
     
     def _init_db(self):
         """Initialize database schema"""
@@ -56,79 +246,163 @@ class DatabaseManager:
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         
-        -- Lead storage with composite unique constraint
-        CREATE TABLE IF NOT EXISTS leads (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id INTEGER NOT NULL,
-            business_name TEXT NOT NULL,
-            city TEXT,
-            state TEXT,
-            phone TEXT,
-            email TEXT,
-            website TEXT,
-            address TEXT,
-            category TEXT,
-            metadata TEXT,
-            score INTEGER DEFAULT 0,
-            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (source_id) REFERENCES sources(id),
-            UNIQUE(business_name, city, phone)
+        -- Conditional-request validators and last body per URL
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            source_id INTEGER,
+            etag TEXT,
+            last_modified TEXT,
+            body BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (source_id) REFERENCES sources(id) ON DELETE CASCADE
         );
         
-        -- Scraping audit logs
-        CREATE TABLE IF NOT EXISTS scraper_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id INTEGER NOT NULL,
-            status TEXT NOT NULL,
-            leads_scraped INTEGER DEFAULT 0,
-            error_message TEXT,
-            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            completed_at TIMESTAMP,
-            FOREIGN KEY (source_id) REFERENCES sources(id)
-        );
-        
-        -- Scheduled jobs
-        CREATE TABLE IF NOT EXISTS scheduled_jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            job_id TEXT UNIQUE NOT NULL,
-            source_id INTEGER NOT NULL,
-            schedule_type TEXT NOT NULL,
-            schedule_config TEXT NOT NULL,
-            max_leads INTEGER,
-            enabled BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (source_id) REFERENCES sources(id)
+        -- Monotonic change counter for read caches
+        CREATE TABLE IF NOT EXISTS db_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
         );
+        INSERT OR IGNORE INTO db_meta (key, value) VALUES ('version', 0);
         
         -- Indexes for performance
-        CREATE INDEX IF NOT EXISTS idx_leads_source ON leads(source_id);
+        CREATE INDEX IF NOT EXISTS idx_leads_src_scraped ON leads(source_id, scraped_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_leads_src_score_scraped ON leads(source_id, score, scraped_at DESC);
+        DROP INDEX IF EXISTS idx_leads_source;  -- prefix of idx_leads_src_scraped
         CREATE INDEX IF NOT EXISTS idx_leads_scraped_at ON leads(scraped_at);
         CREATE INDEX IF NOT EXISTS idx_leads_score ON leads(score);
         CREATE INDEX IF NOT EXISTS idx_logs_source ON scraper_logs(source_id);
         CREATE INDEX IF NOT EXISTS idx_sources_enabled ON sources(enabled);
+        CREATE INDEX IF NOT EXISTS idx_http_cache_source ON http_cache(source_id);
+        CREATE INDEX IF NOT EXISTS idx_http_cache_updated ON http_cache(updated_at);
         """
         
-        with self.get_connection() as conn:
-            conn.executescript(schema)
+        conn = self._connect()
+        try:
+            # Must run outside a transaction; the setting sticks to the database file
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Table rebuilds copy rows as-is, so enforce foreign keys only afterwards
+            conn.execute("PRAGMA foreign_keys=OFF")
+            self._migrate_dedup_hash(conn)
+            self._migrate_cascade(conn)
+            self._migrate_http_cache(conn)
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(
+                self._LEADS_TABLE.format(table='leads')
+                + self._SCRAPER_LOGS_TABLE.format(table='scraper_logs')
+                + self._SCHEDULED_JOBS_TABLE.format(table='scheduled_jobs')
+                + schema
+            )
+            if HAS_FTS5:
+                has_fts = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'leads_fts'"
+                ).fetchone()
+                conn.executescript(self._LEADS_FTS)
+                if not has_fts:
+                    # Index leads stored before the FTS table existed
+                    conn.execute("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')")
+            # Gather planner statistics once the leads table has rows; afterwards
+            # let SQLite decide when they need refreshing
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone() and conn.execute(
+                "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'leads'"
+            ).fetchone()
+            conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _rebuild_table(conn: sqlite3.Connection, table: str, ddl: str, after_copy=None):
+        """Recreate table from ddl and copy its rows over; SQLite cannot alter constraints in place"""
+        columns = ', '.join(row['name'] for row in conn.execute(f"PRAGMA table_info({table})"))
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(ddl.format(table=f'{table}_new'))
+            conn.execute(f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+            if after_copy:
+                after_copy(f'{table}_new')
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _migrate_dedup_hash(self, conn: sqlite3.Connection):
+        """Rebuild a pre-dedup_hash leads table, swapping UNIQUE(name, city, phone) for the hash.
+        
+        Rows that collide under the normalized key keep a NULL hash rather
+        than being deleted.
+        """
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(leads)")}
+        if not existing or 'dedup_hash' in existing:
+            return
+        
+        def backfill(new_table: str):
+            conn.executemany(
+                f"UPDATE OR IGNORE {new_table} SET dedup_hash = ? WHERE id = ?",
+                ((self.lead_key(row['business_name'], row['city'], row['phone']), row['id'])
+                 for row in conn.execute("SELECT id, business_name, city, phone FROM leads ORDER BY id"))
+            )
+        
+        self._rebuild_table(conn, 'leads', self._LEADS_TABLE, after_copy=backfill)
+    
+    def _migrate_cascade(self, conn: sqlite3.Connection):
+        """Rebuild child tables whose source_id foreign key predates ON DELETE CASCADE"""
+        for table, ddl in (('leads', self._LEADS_TABLE),
+                           ('scraper_logs', self._SCRAPER_LOGS_TABLE),
+                           ('scheduled_jobs', self._SCHEDULED_JOBS_TABLE)):
+            foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+            if any(fk['on_delete'] != 'CASCADE' for fk in foreign_keys):
+                self._rebuild_table(conn, table, ddl)
+    
+    @staticmethod
+    def _migrate_http_cache(conn: sqlite3.Connection):
+        """Drop an http_cache table from before entries were tied to a source; it only holds cached pages"""
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(http_cache)")}
+        if existing and 'source_id' not in existing:
+            conn.execute("DROP TABLE http_cache")
+    
+    # ===== CHANGE TRACKING =====
+    
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        """Advance the change counter inside the caller's transaction"""
+        conn.execute("UPDATE db_meta SET value = value + 1 WHERE key = 'version'")
+    
+    def get_version(self) -> int:
+        """Get the change counter, bumped on every write to sources, leads or logs"""
+        with self.get_connection(readonly=True) as conn:
+            row = conn.execute("SELECT value FROM db_meta WHERE key = 'version'").fetchone()
+            return row['value'] if row else 0
     
     # ===== SOURCE MANAGEMENT =====
     
+    @staticmethod
+    def _source_from_row(row: sqlite3.Row) -> Dict:
+        """Convert a sources row to a config dict with decoded JSON fields"""
+        source = dict(row)
+        source['selectors'] = fast_json.loads(source['selectors'])
+        if source['proxy_config']:
+            source['proxy_config'] = fast_json.loads(source['proxy_config'])
+        return source
+    
     def load_sources(self, enabled_only: bool = True) -> List[Dict]:
         """Load source configurations from database"""
         query = "SELECT * FROM sources"
         if enabled_only:
             query += " WHERE enabled = 1"
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute(query)
-            sources = []
-            for row in cursor.fetchall():
-                source = dict(row)
-                source['selectors'] = json.loads(source['selectors'])
-                if source['proxy_config']:
-                    source['proxy_config'] = json.loads(source['proxy_config'])
-                sources.append(source)
-            return sources
+            return [self._source_from_row(row) for row in cursor.fetchall()]
+    
+    def get_source(self, source_id: int) -> Optional[Dict]:
+        """Load a single source configuration by id"""
+        with self.get_connection(readonly=True) as conn:
+            row = conn.execute("SELECT * FROM sources WHERE id = ?", (source_id,)).fetchone()
+            return self._source_from_row(row) if row else None
     
     def add_source(self, config: Dict) -> int:
         """Add new source configuration"""
@@ -143,11 +417,12 @@ class DatabaseManager:
                 config['source_type'],
                 config['base_url'],
                 config['pagination_type'],
-                json.dumps(config['selectors']),
+                fast_json.dumps(config['selectors']),
                 config.get('rate_limit_delay', 3.0),
-                json.dumps(config.get('proxy_config')) if config.get('proxy_config') else None,
+                fast_json.dumps(config.get('proxy_config')) if config.get('proxy_config') else None,
                 config.get('enabled', True)
             ))
+            self._bump_version(conn)
             return cursor.lastrowid
     
     def update_source(self, source_id: int, config: Dict):
@@ -163,109 +438,308 @@ class DatabaseManager:
         
         if 'selectors' in config:
             fields.append("selectors = ?")
-            values.append(json.dumps(config['selectors']))
+            values.append(fast_json.dumps(config['selectors']))
         
         if 'proxy_config' in config:
             fields.append("proxy_config = ?")
-            values.append(json.dumps(config['proxy_config']) if config['proxy_config'] else None)
+            values.append(fast_json.dumps(config['proxy_config']) if config['proxy_config'] else None)
         
-        fields.append("updated_at = ?")
-        values.append(datetime.now())
+        fields.append("updated_at = CURRENT_TIMESTAMP")
         values.append(source_id)
         
         query = f"UPDATE sources SET {', '.join(fields)} WHERE id = ?"
         
         with self.get_connection() as conn:
             conn.execute(query, values)
+            self._bump_version(conn)
     
     def delete_source(self, source_id: int):
-        """Delete a source and its associated data"""
-        with self.get_connection() as conn:
-            # Delete related leads
-            conn.execute("DELETE FROM leads WHERE source_id = ?", (source_id,))
-            # Delete logs
-            conn.execute("DELETE FROM scraper_logs WHERE source_id = ?", (source_id,))
-            # Delete jobs
-            conn.execute("DELETE FROM scheduled_jobs WHERE source_id = ?", (source_id,))
-            # Delete source
+        """Delete a source; its leads, logs, jobs and cached pages go with it via ON DELETE CASCADE"""
+        with self.get_connection(immediate=True) as conn:
             conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+            self._bump_version(conn)
     
     # ===== LEAD MANAGEMENT =====
     
+    @staticmethod
+    def lead_key(business_name: str, city: Optional[str], phone: Optional[str]) -> bytes:
+        """8-byte dedup hash of the normalized name, city and phone digits"""
+        raw = "\x1f".join((
+            (business_name or '').strip().lower(),
+            (city or '').strip().lower(),
+            _NON_DIGIT_RE.sub('', phone or ''),
+        )).encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=8).digest()
+    
+    _LEAD_INSERT = f"""
+    INSERT OR IGNORE INTO leads 
+    (source_id, business_name, city, state, phone, email, website, 
+     address, category, metadata, score, dedup_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {'jsonb(?)' if HAS_JSONB else '?'}, ?, ?)
+    """
+    
+    _LEAD_BASE_COLUMNS = """id, source_id, business_name, city, state, phone, email,
+        website, address, category, score, scraped_at"""
+    
+    @classmethod
+    def _lead_columns(cls, include_metadata: bool = True) -> str:
+        """Select list for leads; json() turns JSONB back into text, NULL skips it"""
+        if not include_metadata:
+            return f"{cls._LEAD_BASE_COLUMNS}, NULL AS metadata"
+        if HAS_JSONB:
+            return f"{cls._LEAD_BASE_COLUMNS}, json(metadata) AS metadata"
+        return f"{cls._LEAD_BASE_COLUMNS}, metadata"
+    
+    # Columns callers may request by name from get_leads / get_leads_summary
+    LEAD_COLUMNS = frozenset((
+        'id', 'source_id', 'business_name', 'city', 'state', 'phone', 'email',
+        'website', 'address', 'category', 'metadata', 'score', 'scraped_at'
+    ))
+    SUMMARY_COLUMNS = ('id', 'business_name', 'city', 'phone', 'score', 'scraped_at')
+    
+    @classmethod
+    def _select_list(cls, columns: Sequence[str]) -> str:
+        """Select list for an allowlisted set of lead columns"""
+        unknown = set(columns) - cls.LEAD_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown lead columns: {', '.join(sorted(unknown))}")
+        return ', '.join(
+            'json(metadata) AS metadata' if col == 'metadata' and HAS_JSONB else col
+            for col in columns
+        )
+    
+    @staticmethod
+    def _leads_filter(source_id: Optional[int], min_score: Optional[int]) -> Tuple[str, list]:
+        """WHERE clause and parameters shared by the lead listing queries"""
+        clauses = []
+        params = []
+        
+        if source_id:
+            clauses.append("source_id = ?")
+            params.append(source_id)
+        
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    @staticmethod
+    def _lead_from_row(row: sqlite3.Row) -> Dict:
+        """Convert a leads row to a dict, decoding metadata when it was selected"""
+        lead = dict(row)
+        if lead['metadata']:
+            lead['metadata'] = fast_json.loads(lead['metadata'])
+        return lead
+    
+    @staticmethod
+    def _lead_params(source_id: int, lead_data: Dict) -> tuple:
+        """Bind parameters for _LEAD_INSERT"""
+        return (
+            source_id,
+            lead_data.get('business_name', ''),
+            lead_data.get('city'),
+            lead_data.get('state'),
+            lead_data.get('phone'),
+            lead_data.get('email'),
+            lead_data.get('website'),
+            lead_data.get('address'),
+            lead_data.get('category'),
+            fast_json.dumps(lead_data.get('metadata', {})),
+            lead_data.get('score', 0),
+            DatabaseManager.lead_key(lead_data.get('business_name', ''),
+                                     lead_data.get('city'), lead_data.get('phone'))
+        )
+    
     def save_lead(self, source_id: int, lead_data: Dict) -> Optional[int]:
         """Save lead with duplicate detection. Returns lead_id if saved, None if duplicate."""
-        query = """
-        INSERT OR IGNORE INTO leads 
-        (source_id, business_name, city, state, phone, email, website, 
-         address, category, metadata, score)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        with self.get_connection() as conn:
-            cursor = conn.execute(query, (
-                source_id,
-                lead_data.get('business_name', ''),
-                lead_data.get('city'),
-                lead_data.get('state'),
-                lead_data.get('phone'),
-                lead_data.get('email'),
-                lead_data.get('website'),
-                lead_data.get('address'),
-                lead_data.get('category'),
-                json.dumps(lead_data.get('metadata', {})),
-                lead_data.get('score', 0)
-            ))
+        with self.get_connection(immediate=True) as conn:
+            cursor = conn.execute(self._LEAD_INSERT, self._lead_params(source_id, lead_data))
             
-            if cursor.rowcount > 0:
-                return cursor.lastrowid
-            return None
+            lead_id = cursor.lastrowid if cursor.rowcount > 0 else None
+            if lead_id:
+                self._bump_version(conn)
+        
+        return lead_id
     
     def bulk_save_leads(self, source_id: int, leads: List[Dict]) -> Dict[str, int]:
-        """Bulk insert with duplicate tracking"""
-        saved = 0
-        duplicates = 0
+        """Bulk insert in a single transaction with duplicate tracking"""
+        with self.bulk_save_context(source_id) as flush:
+            return flush(leads)
+    
+    @contextmanager
+    def bulk_save_context(self, source_id: int, commit_every: int = 1):
+        """Use this thread's write connection for a whole scrape and yield flush(leads) -> counts.
+        
+        Every flush reuses the connection's prepared INSERT. The write lock is
+        released after commit_every batches so other writers are not blocked
+        while a scraper waits on the network; leftovers commit on exit.
+        """
+        conn = self._thread_connection()
+        batches = 0
         
-        for lead in leads:
-            result = self.save_lead(source_id, lead)
-            if result:
-                saved += 1
-            else:
-                duplicates += 1
+        def commit():
+            nonlocal batches
+            conn.execute("COMMIT")
+            batches = 0
         
-        return {'saved': saved, 'duplicates': duplicates}
+        def flush(leads: List[Dict]) -> Dict[str, int]:
+            nonlocal batches
+            if not leads:
+                return {'saved': 0, 'duplicates': 0}
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            
+            # Generator so metadata is serialized row by row as executemany consumes it;
+            # rowcount skips the leads_fts trigger writes that total_changes would include
+            cursor = conn.executemany(self._LEAD_INSERT,
+                                      (self._lead_params(source_id, lead) for lead in leads))
+            saved = cursor.rowcount
+            if saved:
+                self._bump_version(conn)
+            
+            batches += 1
+            if batches >= commit_every:
+                commit()
+            return {'saved': saved, 'duplicates': len(leads) - saved}
+        
+        try:
+            yield flush
+            if conn.in_transaction:
+                commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
     
     def get_leads(self, source_id: Optional[int] = None, 
                   limit: int = 1000, offset: int = 0,
-                  min_score: Optional[int] = None) -> List[Dict]:
-        """Retrieve leads with optional filtering"""
-        query = "SELECT * FROM leads WHERE 1=1"
-        params = []
+                  min_score: Optional[int] = None,
+                  include_metadata: bool = True,
+                  columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Retrieve leads with optional filtering; same arguments as iter_leads"""
+        query, params, include_metadata = self._leads_query(
+            source_id, min_score, limit, offset, include_metadata, columns)
         
-        if source_id:
-            query += " AND source_id = ?"
-            params.append(source_id)
+        with self.get_connection(readonly=True) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return list(map(self._lead_from_row if include_metadata else dict, rows))
+    
+    def get_leads_summary(self, source_id: Optional[int] = None,
+                          limit: int = 1000, offset: int = 0,
+                          min_score: Optional[int] = None,
+                          columns: Sequence[str] = SUMMARY_COLUMNS) -> List[tuple]:
+        """Plain row tuples for list views, in the order of columns; no dicts or JSON"""
+        where, params = self._leads_filter(source_id, min_score)
+        query = (f"SELECT {self._select_list(columns)} FROM leads{where} "
+                 f"ORDER BY scraped_at DESC LIMIT ? OFFSET ?")
+        params.extend([limit, offset])
         
-        if min_score is not None:
-            query += " AND score >= ?"
-            params.append(min_score)
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.execute(query, params)
+            cursor.row_factory = None
+            return cursor.fetchall()
+    
+    def get_leads_by_metadata_field(self, field: str, value: Any,
+                                    limit: int = 1000) -> List[Dict]:
+        """Leads whose metadata has field == value, filtered inside SQLite"""
+        query = f"""
+        SELECT {self._lead_columns()} FROM leads
+        WHERE json_extract(metadata, '$.' || ?) = ?
+        ORDER BY scraped_at DESC LIMIT ?
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.execute(query, (field, value, limit))
+            return [self._lead_from_row(row) for row in cursor.fetchall()]
+    
+    def search_leads(self, query: str, limit: int = 100) -> List[Dict]:
+        """Leads whose name, address or category match every word of query, best first"""
+        terms = query.split()
+        if not terms:
+            return []
         
-        query += " ORDER BY scraped_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        if HAS_FTS5:
+            # Quote each word so user input is never parsed as FTS syntax; match as prefix
+            match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+            sql = f"""
+            SELECT {self._lead_columns()} FROM leads
+            JOIN (
+                SELECT rowid AS fts_id, rank FROM leads_fts
+                WHERE leads_fts MATCH ? ORDER BY rank LIMIT ?
+            ) hits ON leads.id = hits.fts_id
+            ORDER BY hits.rank
+            """
+            params = [match, limit]
+        else:
+            clause = "(business_name LIKE ? OR address LIKE ? OR category LIKE ?)"
+            sql = (f"SELECT {self._lead_columns()} FROM leads WHERE "
+                   + " AND ".join([clause] * len(terms))
+                   + " ORDER BY scraped_at DESC LIMIT ?")
+            params = [f"%{term}%" for term in terms for _ in range(3)] + [limit]
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.execute(sql, params)
+            return [self._lead_from_row(row) for row in cursor.fetchall()]
+    
+    def iter_leads(self, chunk_size: int = 1000,
+                   include_metadata: bool = True,
+                   source_id: Optional[int] = None,
+                   min_score: Optional[int] = None,
+                   limit: Optional[int] = None, offset: int = 0,
+                   columns: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """Stream leads newest-first, fetching chunk_size rows at a time.
+        
+        columns limits the result to those LEAD_COLUMNS; metadata is only
+        decoded when it is selected. limit=None streams every matching lead.
+        The generator reads on its own connection, so a half-consumed one
+        never pins the thread's cached connection to an old snapshot.
+        """
+        query, params, include_metadata = self._leads_query(
+            source_id, min_score, limit, offset, include_metadata, columns)
+        convert = self._lead_from_row if include_metadata else dict
+        
+        conn = self._connect(readonly=True)
+        try:
             cursor = conn.execute(query, params)
-            leads = []
-            for row in cursor.fetchall():
-                lead = dict(row)
-                if lead['metadata']:
-                    lead['metadata'] = json.loads(lead['metadata'])
-                leads.append(lead)
-            return leads
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from map(convert, rows)
+        finally:
+            conn.close()
+    
+    def _leads_query(self, source_id: Optional[int], min_score: Optional[int],
+                     limit: Optional[int], offset: int, include_metadata: bool,
+                     columns: Optional[Sequence[str]]) -> Tuple[str, list, bool]:
+        """SELECT, parameters and whether metadata is decoded, for get_leads/iter_leads"""
+        if columns:
+            select = self._select_list(columns)
+            include_metadata = 'metadata' in columns
+        else:
+            select = self._lead_columns(include_metadata)
+        
+        where, params = self._leads_filter(source_id, min_score)
+        query = f"SELECT {select} FROM leads{where} ORDER BY scraped_at DESC LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        return query, params, include_metadata
     
     def update_lead_score(self, lead_id: int, score: int):
         """Update lead quality score"""
         with self.get_connection() as conn:
             conn.execute("UPDATE leads SET score = ? WHERE id = ?", (score, lead_id))
+            self._bump_version(conn)
+    
+    def update_lead_scores(self, pairs: Sequence[Tuple[int, int]]) -> int:
+        """Update many (lead_id, score) pairs in one transaction; returns rows changed"""
+        if not pairs:
+            return 0
+        with self.get_connection(immediate=True) as conn:
+            cursor = conn.executemany("UPDATE leads SET score = ? WHERE id = ?",
+                                      ((score, lead_id) for lead_id, score in pairs))
+            if cursor.rowcount:
+                self._bump_version(conn)
+            return cursor.rowcount
     
     def count_leads(self, source_id: Optional[int] = None) -> int:
         """Count total leads"""
@@ -276,7 +750,7 @@ class DatabaseManager:
             query += " WHERE source_id = ?"
             params.append(source_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute(query, params)
             return cursor.fetchone()['count']
     
@@ -285,11 +759,12 @@ class DatabaseManager:
     def start_scrape_log(self, source_id: int) -> int:
         """Create initial log entry for scraping session"""
         query = """
-        INSERT INTO scraper_logs (source_id, status, started_at)
-        VALUES (?, 'started', ?)
+        INSERT INTO scraper_logs (source_id, status)
+        VALUES (?, 'started')
         """
         with self.get_connection() as conn:
-            cursor = conn.execute(query, (source_id, datetime.now()))
+            cursor = conn.execute(query, (source_id,))
+            self._bump_version(conn)
             return cursor.lastrowid
     
     def update_scrape_log(self, log_id: int, status: str, 
@@ -297,11 +772,12 @@ class DatabaseManager:
         """Update scraping log with results"""
         query = """
         UPDATE scraper_logs 
-        SET status = ?, leads_scraped = ?, error_message = ?, completed_at = ?
+        SET status = ?, leads_scraped = ?, error_message = ?, completed_at = CURRENT_TIMESTAMP
         WHERE id = ?
         """
         with self.get_connection() as conn:
-            conn.execute(query, (status, leads_scraped, error, datetime.now(), log_id))
+            conn.execute(query, (status, leads_scraped, error, log_id))
+            self._bump_version(conn)
     
     def get_recent_logs(self, limit: int = 50, source_id: Optional[int] = None) -> List[Dict]:
         """Get recent scraping logs"""
@@ -319,7 +795,7 @@ class DatabaseManager:
         query += " ORDER BY l.started_at DESC LIMIT ?"
         params.append(limit)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     
@@ -339,7 +815,68 @@ class DatabaseManager:
             query += " WHERE source_id = ?"
             params.append(source_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute(query, params)
             row = cursor.fetchone()
             return dict(row) if row else {}
+    
+    EMPTY_SCRAPE_STATS = {'total_runs': 0, 'successful': 0, 'failed': 0, 'total_leads': 0}
+    
+    def get_all_source_stats(self) -> Dict[int, Dict]:
+        """Lead counts and scrape stats for every source that has any, keyed by source_id"""
+        empty_stats = self.EMPTY_SCRAPE_STATS
+        stats: Dict[int, Dict] = {}
+        
+        with self.get_connection(readonly=True) as conn:
+            for row in conn.execute("SELECT source_id, COUNT(*) FROM leads GROUP BY source_id"):
+                stats[row[0]] = {'leads': row[1], 'scrape_stats': dict(empty_stats)}
+            
+            query = """
+            SELECT 
+                source_id,
+                COUNT(*) as total_runs,
+                SUM(status = 'success') as successful,
+                SUM(status = 'failed') as failed,
+                SUM(leads_scraped) as total_leads
+            FROM scraper_logs
+            GROUP BY source_id
+            """
+            for row in conn.execute(query):
+                entry = stats.setdefault(row['source_id'], {'leads': 0})
+                entry['scrape_stats'] = {k: row[k] or 0 for k in empty_stats}
+        
+        return stats
+    
+    # ===== HTTP CACHE =====
+    
+    def get_http_cache(self, url: str) -> Optional[Dict]:
+        """Get cached validators and decompressed body for a URL"""
+        with self.get_connection(readonly=True) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            entry = dict(row)
+            entry['body'] = zlib.decompress(entry['body'])
+            return entry
+    
+    def save_http_cache(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                        body: bytes, source_id: Optional[int] = None):
+        """Store validators and a compressed copy of the body for a URL.
+        
+        Every HTTP_CACHE_EVICT_EVERY saves, entries beyond HTTP_CACHE_MAX_ENTRIES
+        are evicted oldest first.
+        """
+        query = """
+        INSERT OR REPLACE INTO http_cache (url, source_id, etag, last_modified, body, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """
+        with self.get_connection() as conn:
+            conn.execute(query, (url, source_id, etag, last_modified, zlib.compress(body)))
+            if next(self._http_cache_saves) % HTTP_CACHE_EVICT_EVERY == 0:
+                conn.execute("""
+                    DELETE FROM http_cache WHERE url IN (
+                        SELECT url FROM http_cache ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (HTTP_CACHE_MAX_ENTRIES,))
@@ -1,26 +1,96 @@
+import asyncio
+import atexit
+import json
 import logging
-from typing import Dict, List, Optional, Type
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Type, Union
 from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
 import importlib
+import importlib.util
 import inspect
+import multiprocessing
+import threading
+import time
 
 from core.db import DatabaseManager
 from core.base_scraper import BaseScraper
+from core.scoring import LeadScorer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scrape progress is logged at most once per interval, or every N scraped leads
+PROGRESS_LOG_SECONDS = 1.0
+PROGRESS_LOG_LEADS = 1000
+
+# source_type -> "module:Class" map from the last full discovery, keyed by the package signature
+REGISTRY_CACHE_PATH = Path(
+    os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')
+) / 'harvest' / 'scrapers.json'
+
 
 class HarvestEngine:
     """Core orchestration engine for lead generation"""
     
-    def __init__(self, db_path: str = "harvest.db"):
-        """Initialize the Harvest engine"""
+    def __init__(self, db_path: str = "harvest.db", parse_workers: int = 0):
+        """Initialize the Harvest engine.
+        
+        parse_workers > 0 parses pages in a process pool of that size;
+        0 parses in the scraping thread.
+        """
         self.db = DatabaseManager(db_path)
-        self.scraper_registry: Dict[str, Type[BaseScraper]] = {}
+        self.parse_workers = parse_workers
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_lock = threading.Lock()
+        # Values are classes, or "module:Class" strings imported on first use
+        self.scraper_registry: Dict[str, Union[Type[BaseScraper], str]] = {}
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._host_lock = threading.Lock()
         self._discover_scrapers()
     
+    @staticmethod
+    def _scrapers_signature() -> Optional[str]:
+        """Identify the scrapers package contents by location and newest module mtime"""
+        spec = importlib.util.find_spec('scrapers')
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        
+        parts = []
+        for location in spec.submodule_search_locations:
+            mtimes = [entry.stat().st_mtime for entry in os.scandir(location)
+                      if entry.name.endswith('.py')]
+            parts.append(f"{os.path.abspath(location)}:{len(mtimes)}:{max(mtimes, default=0)}")
+        return '|'.join(parts)
+    
     def _discover_scrapers(self):
+        """Register scrapers from the on-disk cache, or by importing every scraper module"""
+        signature = self._scrapers_signature()
+        try:
+            cached = json.loads(REGISTRY_CACHE_PATH.read_text())
+            if signature and cached.get('signature') == signature:
+                self.scraper_registry.update(cached['scrapers'])
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        self._import_scrapers()
+        
+        try:
+            REGISTRY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            REGISTRY_CACHE_PATH.write_text(json.dumps({
+                'signature': signature,
+                'scrapers': {
+                    source_type: f"{cls.__module__}:{cls.__qualname__}"
+                    for source_type, cls in self.scraper_registry.items()
+                }
+            }))
+        except OSError as e:
+            logger.debug(f"Could not write scraper registry cache: {e}")
+    
+    def _import_scrapers(self):
         """Dynamically discover and register all scraper classes"""
         try:
             scrapers_module = importlib.import_module('scrapers')
@@ -63,15 +133,46 @@ class HarvestEngine:
         
         try:
             scraper_class = self.scraper_registry[source_type]
-            return scraper_class(config)
+            if isinstance(scraper_class, str):
+                module_name, _, class_name = scraper_class.partition(':')
+                scraper_class = getattr(importlib.import_module(module_name), class_name)
+                self.scraper_registry[source_type] = scraper_class
+            scraper = scraper_class(config)
+            scraper.http_cache = self.db
+            scraper.parse_pool = self._get_parse_pool()
+            return scraper
         except Exception as e:
             logger.error(f"Failed to instantiate scraper {source_type}: {e}")
             return None
     
+    def _get_parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Lazily start the shared parse pool, if enabled.
+        
+        Workers are spawned rather than forked, since forking a process with
+        live scraping threads can copy held locks into the children.
+        """
+        if self.parse_workers <= 0:
+            return None
+        
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                atexit.register(self.shutdown_parse_pool)
+        return self._parse_pool
+    
+    def shutdown_parse_pool(self):
+        """Stop the parse pool's worker processes, if it was started"""
+        with self._parse_pool_lock:
+            pool, self._parse_pool = self._parse_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
     def run_scraper(self, source_id: int, max_leads: Optional[int] = None) -> Dict:
         """Execute scraping for a specific source"""
-        sources = self.db.load_sources(enabled_only=False)
-        source_config = next((s for s in sources if s['id'] == source_id), None)
+        source_config = self.db.get_source(source_id)
         
         if not source_config:
             return {'success': False, 'error': 'Source not found'}
@@ -99,32 +200,40 @@ class HarvestEngine:
             
             leads_buffer = []
             buffer_size = 50
+            last_log = time.monotonic()
+            last_logged = 0
             
-            for idx, lead_data in enumerate(scraper.scrape()):
-                if max_leads and idx >= max_leads:
-                    break
-                
-                if not scraper.validate_lead(lead_data):
-                    result['errors'].append(f"Invalid lead skipped: {lead_data.get('business_name', 'Unknown')}")
-                    continue
-                
-                leads_buffer.append(lead_data)
-                result['leads_scraped'] += 1
+            with self.db.bulk_save_context(source_id) as flush:
+                for idx, lead_data in enumerate(scraper.scrape()):
+                    if max_leads and idx >= max_leads:
+                        break
+                    
+                    if not scraper.validate_lead(lead_data):
+                        result['errors'].append(f"Invalid lead skipped: {lead_data.get('business_name', 'Unknown')}")
+                        continue
+                    
+                    result['leads_scraped'] += 1
+                    leads_buffer.append(lead_data)
+                    
+                    if len(leads_buffer) >= buffer_size:
+                        save_result = flush(leads_buffer)
+                        result['leads_saved'] += save_result['saved']
+                        result['duplicates'] += save_result['duplicates']
+                        leads_buffer = []
+                        
+                        now = time.monotonic()
+                        if (now - last_log >= PROGRESS_LOG_SECONDS or
+                                result['leads_scraped'] - last_logged >= PROGRESS_LOG_LEADS):
+                            logger.info("Progress: %d scraped, %d saved, %d duplicates",
+                                        result['leads_scraped'], result['leads_saved'],
+                                        result['duplicates'])
+                            last_log = now
+                            last_logged = result['leads_scraped']
                 
-                if len(leads_buffer) >= buffer_size:
-                    save_result = self.db.bulk_save_leads(source_id, leads_buffer)
+                if leads_buffer:
+                    save_result = flush(leads_buffer)
                     result['leads_saved'] += save_result['saved']
                     result['duplicates'] += save_result['duplicates']
-                    leads_buffer = []
-                    
-                    logger.info(f"Progress: {result['leads_scraped']} scraped, "
-                              f"{result['leads_saved']} saved, "
-                              f"{result['duplicates']} duplicates")
-            
-            if leads_buffer:
-                save_result = self.db.bulk_save_leads(source_id, leads_buffer)
-                result['leads_saved'] += save_result['saved']
-                result['duplicates'] += save_result['duplicates']
             
             result['success'] = True
             self.db.update_scrape_log(log_id, 'success', leads_scraped=result['leads_saved'])
@@ -144,6 +253,36 @@ class HarvestEngine:
         
         return result
     
+    async def arun_scrapers(self, source_ids: List[int],
+                            max_leads: Optional[int] = None) -> List[Dict]:
+        """Run several sources concurrently on one event loop.
+        
+        Each scrape runs in the loop's default executor; sources that share
+        a host are serialized so per-host rate limits still hold.
+        """
+        loop = asyncio.get_running_loop()
+        
+        tasks = [
+            loop.run_in_executor(None, self._run_host_limited, source_id, max_leads)
+            for source_id in source_ids
+        ]
+        return list(await asyncio.gather(*tasks))
+    
+    def _host_semaphore(self, base_url: str) -> threading.Semaphore:
+        """Get the semaphore guarding scrapes against a single host"""
+        host = urlparse(base_url).netloc
+        with self._host_lock:
+            return self._host_semaphores.setdefault(host, threading.Semaphore(1))
+    
+    def _run_host_limited(self, source_id: int, max_leads: Optional[int]) -> Dict:
+        """Run a scrape while holding its host's semaphore"""
+        source = self.db.get_source(source_id)
+        if not source:
+            return self.run_scraper(source_id, max_leads=max_leads)
+        
+        with self._host_semaphore(source['base_url']):
+            return self.run_scraper(source_id, max_leads=max_leads)
+    
     def run_all_sources(self, max_leads_per_source: Optional[int] = None) -> List[Dict]:
         """Run all enabled sources sequentially"""
         sources = self.db.load_sources(enabled_only=True)
@@ -157,6 +296,29 @@ class HarvestEngine:
         
         return results
     
+    def rescore_leads(self, source_id: Optional[int] = None, batch_size: int = 1000) -> int:
+        """Recompute LeadScorer scores, writing changed ones back in batches"""
+        updated = 0
+        batch = []
+        
+        for lead in self.db.iter_leads(source_id=source_id):
+            batch.append(lead)
+            if len(batch) >= batch_size:
+                updated += self._rescore_batch(batch)
+                batch = []
+        
+        if batch:
+            updated += self._rescore_batch(batch)
+        logger.info("Rescored leads: %d updated", updated)
+        return updated
+    
+    def _rescore_batch(self, leads: List[Dict]) -> int:
+        """Score a batch of leads at once and save the scores that changed"""
+        scores = LeadScorer.score_leads(leads).tolist()
+        return self.db.update_lead_scores([
+            (lead['id'], score) for lead, score in zip(leads, scores) if score != lead['score']
+        ])
+    
     def get_stats(self) -> Dict:
         """Get overall platform statistics"""
         sources = self.db.load_sources(enabled_only=False)
@@ -168,9 +330,11 @@ class HarvestEngine:
             'sources': []
         }
         
+        per_source = self.db.get_all_source_stats()
+        
         for source in sources:
-            source_stats = self.db.get_scrape_stats(source['id'])
-            lead_count = self.db.count_leads(source['id'])
+            source_stats = per_source.get(source['id'], {})
+            lead_count = source_stats.get('leads', 0)
             
             stats['total_leads'] += lead_count
             stats['sources'].append({
@@ -178,7 +342,7 @@ class HarvestEngine:
                 'name': source['name'],
                 'enabled': source['enabled'],
                 'leads': lead_count,
-                'scrape_stats': source_stats
+                'scrape_stats': source_stats.get('scrape_stats', dict(self.db.EMPTY_SCRAPE_STATS))
             })
         
         return stats
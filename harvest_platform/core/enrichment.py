@@ -1,10 +1,21 @@
 import requests
-from typing import Dict, Optional, List
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, List
 import re
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+_NON_DIGIT_RE = re.compile(r'\D')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_SCHEME_RE = re.compile(r'https?://')
+_WWW_RE = re.compile(r'^www\.')
+
+# Successful lookups remembered per enricher, per API, oldest dropped first
+LOOKUP_CACHE_SIZE = 1024
+
 
 class LeadEnricher:
     """Enrich leads with additional data"""
@@ -13,14 +24,56 @@ class LeadEnricher:
         self.config = config or {}
         self.clearbit_key = self.config.get('clearbit_api_key')
         self.hunter_key = self.config.get('hunter_api_key')
+        self.max_workers = self.config.get('max_workers', 8)
+        # Keep-alive pool sized to the lookup threads so no connection is discarded
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+        self._session.mount("https://", adapter)
+        # Per-instance results of successful API lookups, keyed by domain; failures
+        # (timeouts, 429s) are not stored so the next call asks again
+        self._clearbit_cache: Dict[str, Dict] = {}
+        self._email_cache: Dict[str, List[str]] = {}
+        self._cache_lock = threading.Lock()
+    
+    def enrich_leads(self, leads: List[Dict]) -> List[Dict]:
+        """Enrich a batch, looking up each distinct domain once and concurrently"""
+        domains = {self.extract_domain(lead['website']) for lead in leads if lead.get('website')}
+        lookups = []
+        if self.clearbit_key:
+            lookups.append((self.get_clearbit_data, domains))
+        if self.hunter_key:
+            lookups.append((self.find_emails, {
+                self.extract_domain(lead['website'])
+                for lead in leads if lead.get('website') and not lead.get('email')
+            }))
+        
+        jobs = [(fetch, domain) for fetch, pending in lookups for domain in pending]
+        results = {}
+        if jobs:
+            # Run every lookup in one concurrent pass; failed ones aren't retried per lead
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = dict(zip(jobs, executor.map(lambda job: job[0](job[1]), jobs)))
+        
+        return [
+            self._enrich(lead,
+                         lambda domain: results.get((self.get_clearbit_data, domain)),
+                         lambda domain: results.get((self.find_emails, domain)))
+            for lead in leads
+        ]
     
     def enrich_lead(self, lead: Dict) -> Dict:
         """Enrich a single lead"""
+        return self._enrich(lead, self.get_clearbit_data, self.find_emails)
+    
+    def _enrich(self, lead: Dict, company_lookup: Callable[[str], Optional[Dict]],
+                email_lookup: Callable[[str], Optional[List[str]]]) -> Dict:
+        """Enrich a lead using the given per-domain lookups"""
         enriched = lead.copy()
         
         if lead.get('phone'):
-            enriched['phone_formatted'] = self.format_phone(lead['phone'])
-            enriched['phone_valid'] = self.validate_phone(lead['phone'])
+            digits = _NON_DIGIT_RE.sub('', lead['phone'])
+            enriched['phone_formatted'] = self.format_phone(lead['phone'], digits)
+            enriched['phone_valid'] = self.validate_phone(lead['phone'], digits)
         
         if lead.get('email'):
             enriched['email_valid'] = self.validate_email(lead['email'])
@@ -29,14 +82,14 @@ class LeadEnricher:
             enriched['domain'] = self.extract_domain(lead['website'])
             
             if self.clearbit_key:
-                company_data = self.get_clearbit_data(enriched['domain'])
+                company_data = company_lookup(enriched['domain'])
                 if company_data:
                     if 'metadata' not in enriched:
                         enriched['metadata'] = {}
                     enriched['metadata']['enrichment'] = company_data
         
         if not lead.get('email') and self.hunter_key and enriched.get('domain'):
-            found_emails = self.find_emails(enriched['domain'])
+            found_emails = email_lookup(enriched['domain'])
             if found_emails:
                 enriched['email'] = found_emails[0]
                 if 'metadata' not in enriched:
@@ -46,9 +99,10 @@ class LeadEnricher:
         return enriched
     
     @staticmethod
-    def format_phone(phone: str) -> str:
+    def format_phone(phone: str, digits: Optional[str] = None) -> str:
         """Format phone number to E.164"""
-        digits = re.sub(r'\D', '', phone)
+        if digits is None:
+            digits = _NON_DIGIT_RE.sub('', phone)
         
         if len(digits) == 10:
             return f"+1{digits}"
@@ -58,22 +112,22 @@ class LeadEnricher:
         return phone
     
     @staticmethod
-    def validate_phone(phone: str) -> bool:
+    def validate_phone(phone: str, digits: Optional[str] = None) -> bool:
         """Basic phone validation"""
-        digits = re.sub(r'\D', '', phone)
+        if digits is None:
+            digits = _NON_DIGIT_RE.sub('', phone)
         return len(digits) >= 10
     
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(_EMAIL_RE.match(email))
     
     @staticmethod
     def extract_domain(url: str) -> str:
         """Extract domain from URL"""
-        domain = re.sub(r'https?://', '', url)
-        domain = re.sub(r'^www\.', '', domain)
+        domain = _SCHEME_RE.sub('', url)
+        domain = _WWW_RE.sub('', domain)
         domain = domain.split('/')[0]
         return domain
     
@@ -82,8 +136,12 @@ class LeadEnricher:
         if not self.clearbit_key:
             return None
         
+        cached = self._clearbit_cache.get(domain)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"https://company.clearbit.com/v2/companies/find",
                 params={'domain': domain},
                 headers={'Authorization': f'Bearer {self.clearbit_key}'},
@@ -92,7 +150,7 @@ class LeadEnricher:
             
             if response.status_code == 200:
                 data = response.json()
-                return {
+                company = {
                     'name': data.get('name'),
                     'description': data.get('description'),
                     'employees': data.get('metrics', {}).get('employees'),
@@ -100,6 +158,8 @@ class LeadEnricher:
                     'linkedin': data.get('linkedin', {}).get('handle'),
                     'twitter': data.get('twitter', {}).get('handle')
                 }
+                self._remember(self._clearbit_cache, domain, company)
+                return company
         except Exception as e:
             logger.warning(f"Clearbit enrichment failed for {domain}: {e}")
         
@@ -110,8 +170,12 @@ class LeadEnricher:
         if not self.hunter_key:
             return []
         
+        cached = self._email_cache.get(domain)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(
+            response = self._session.get(
                 "https://api.hunter.io/v2/domain-search",
                 params={'domain': domain, 'api_key': self.hunter_key},
                 timeout=10
@@ -124,8 +188,16 @@ class LeadEnricher:
                     for email in data.get('data', {}).get('emails', [])
                     if email.get('type') == 'generic'
                 ]
+                self._remember(self._email_cache, domain, emails[:3])
                 return emails[:3]
         except Exception as e:
             logger.warning(f"Hunter.io search failed for {domain}: {e}")
         
         return []
+    
+    def _remember(self, cache: Dict, domain: str, value):
+        """Store a successful lookup, dropping the oldest entry when the cache is full"""
+        with self._cache_lock:
+            if domain not in cache and len(cache) >= LOOKUP_CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[domain] = value
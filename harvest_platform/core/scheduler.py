@@ -1,6 +1,6 @@
+import asyncio
 import threading
-import schedule
-import time
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import datetime
 from typing import Dict, Optional
 import logging
@@ -13,22 +13,35 @@ class HarvestScheduler:
     
     def __init__(self, engine):
         self.engine = engine
-        self.scheduler = schedule.Scheduler()
+        self.scheduler = None
         self.running = False
         self.thread = None
+        self.loop = asyncio.new_event_loop()
+        self._stopped = None
         self.jobs = {}
+    
+    def _get_scheduler(self) -> AsyncIOScheduler:
+        """APScheduler bound to this scheduler's event loop; jobs are coroutines run on it"""
+        if self.scheduler is None:
+            self.scheduler = AsyncIOScheduler(event_loop=self.loop)
+        return self.scheduler
+    
+    def _add_job(self, job_id: str, source_id: int, max_leads: Optional[int],
+                 trigger: str, **trigger_args):
+        """Register _run_job under job_id, replacing any job with the same id"""
+        return self._get_scheduler().add_job(
+            self._run_job, trigger, id=job_id, replace_existing=True,
+            kwargs={'source_id': source_id, 'max_leads': max_leads, 'job_id': job_id},
+            **trigger_args
+        )
         
     def add_daily_job(self, source_id: int, time_str: str, 
                      max_leads: Optional[int] = None) -> str:
         """Schedule daily scraping at specific time"""
         job_id = f"daily_{source_id}_{time_str.replace(':', '')}"
         
-        job = self.scheduler.every().day.at(time_str).do(
-            self._run_with_error_handling,
-            source_id=source_id,
-            max_leads=max_leads,
-            job_id=job_id
-        )
+        hour, minute = map(int, time_str.split(':'))
+        job = self._add_job(job_id, source_id, max_leads, 'cron', hour=hour, minute=minute)
         
         self.jobs[job_id] = {
             'job': job,
@@ -45,12 +58,7 @@ class HarvestScheduler:
         """Schedule scraping every N hours"""
         job_id = f"interval_{source_id}_{hours}h"
         
-        job = self.scheduler.every(hours).hours.do(
-            self._run_with_error_handling,
-            source_id=source_id,
-            max_leads=max_leads,
-            job_id=job_id
-        )
+        job = self._add_job(job_id, source_id, max_leads, 'interval', hours=hours)
         
         self.jobs[job_id] = {
             'job': job,
@@ -67,13 +75,9 @@ class HarvestScheduler:
         """Schedule weekly scraping"""
         job_id = f"weekly_{source_id}_{day}_{time_str.replace(':', '')}"
         
-        day_scheduler = getattr(self.scheduler.every(), day.lower())
-        job = day_scheduler.at(time_str).do(
-            self._run_with_error_handling,
-            source_id=source_id,
-            max_leads=max_leads,
-            job_id=job_id
-        )
+        hour, minute = map(int, time_str.split(':'))
+        job = self._add_job(job_id, source_id, max_leads, 'cron',
+                            day_of_week=day[:3].lower(), hour=hour, minute=minute)
         
         self.jobs[job_id] = {
             'job': job,
@@ -84,11 +88,12 @@ class HarvestScheduler:
         
         return job_id
     
-    def _run_with_error_handling(self, source_id: int, max_leads: Optional[int], job_id: str):
-        """Wrapper with error handling"""
+    async def _run_job(self, source_id: int, max_leads: Optional[int], job_id: str):
+        """Run a scheduled scrape with error handling"""
         try:
             logger.info(f"Starting scheduled job: {job_id}")
-            result = self.engine.run_scraper(source_id, max_leads=max_leads)
+            results = await self.engine.arun_scrapers([source_id], max_leads=max_leads)
+            result = results[0]
             
             if result['success']:
                 logger.info(f"Job {job_id} completed: {result['leads_saved']} leads saved")
@@ -101,12 +106,12 @@ class HarvestScheduler:
     def remove_job(self, job_id: str):
         """Cancel a scheduled job"""
         if job_id in self.jobs:
-            self.scheduler.cancel_job(self.jobs[job_id]['job'])
+            self._get_scheduler().remove_job(job_id)
             del self.jobs[job_id]
             logger.info(f"Cancelled job: {job_id}")
     
     def start(self):
-        """Start scheduler in background thread"""
+        """Start scheduler on its own event loop in a background thread"""
         if self.running:
             return
         
@@ -116,13 +121,28 @@ class HarvestScheduler:
         logger.info("Scheduler started")
     
     def _run_loop(self):
-        """Main scheduler loop"""
-        while self.running:
-            self.scheduler.run_pending()
-            time.sleep(1)
+        """Own the scheduler's event loop until stopped"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.close()
+    
+    async def _serve(self):
+        """Let APScheduler wake the loop for due jobs, then drain in-flight runs once stopped"""
+        self._stopped = asyncio.Event()
+        scheduler = self._get_scheduler()
+        scheduler.start()
+        await self._stopped.wait()
+        scheduler.shutdown(wait=False)
+        
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        await asyncio.gather(*pending, return_exceptions=True)
     
     def stop(self):
         """Stop the scheduler"""
+        if self.running and self._stopped is not None:
+            self.loop.call_soon_threadsafe(self._stopped.set)
         self.running = False
         if self.thread:
             self.thread.join(timeout=5)
@@ -130,10 +150,13 @@ class HarvestScheduler:
     
     def get_jobs(self) -> Dict:
         """Get all scheduled jobs"""
-        return {
-            job_id: {
+        jobs = {}
+        for job_id, job_info in self.jobs.items():
+            job = self._get_scheduler().get_job(job_id)
+            # Jobs added before start() have no next run time yet
+            next_run = getattr(job, 'next_run_time', None)
+            jobs[job_id] = {
                 **job_info,
-                'next_run': job_info['job'].next_run.isoformat() if job_info['job'].next_run else None
+                'next_run': next_run.isoformat() if next_run else None
             }
-            for job_id, job_info in self.jobs.items()
-        }
+        return jobs
@@ -1,5 +1,20 @@
-from typing import Dict
+from typing import Callable, Dict, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+import time
+
+import numpy as np
+
+# 'YYYY-MM-DDTHH:MM:SS' or SQLite's 'YYYY-MM-DD HH:MM:SS', optionally followed by fractions/offset
+_ISO_STAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}')
+
+
+@lru_cache(maxsize=1)
+def _score_kernel() -> Optional[Callable]:
+    """The numba scoring kernel, imported (and JIT-compiled) on first batch; None without numba"""
+    from utils.scoring_numba import score_kernel
+    return score_kernel
 
 
 class LeadScorer:
@@ -16,6 +31,15 @@ class LeadScorer:
         'freshness': 5
     }
     
+    SOCIAL_KEYS = ('linkedin', 'facebook', 'instagram')
+    
+    FLAG_ORDER = ('has_phone', 'phone_valid', 'has_email', 'email_valid',
+                  'has_website', 'has_address', 'has_social', 'freshness')
+    
+    # Freshness cutoff as ('T'-separated, space-separated) ISO strings, and when it was computed
+    _cutoffs = ('', '')
+    _cutoffs_at = float('-inf')
+    
     @classmethod
     def score_lead(cls, lead: Dict) -> int:
         """Calculate quality score (0-100)"""
@@ -38,22 +62,99 @@ class LeadScorer:
             score += cls.WEIGHTS['has_address']
         
         metadata = lead.get('metadata', {})
-        if any(k in metadata for k in ['linkedin', 'facebook', 'instagram']):
+        if any(k in metadata for k in cls.SOCIAL_KEYS):
             score += cls.WEIGHTS['has_social']
         
-        if lead.get('scraped_at'):
-            try:
-                scraped_date = lead['scraped_at']
-                if isinstance(scraped_date, str):
-                    scraped_date = datetime.fromisoformat(scraped_date.replace('Z', '+00:00'))
-                
-                if datetime.now() - scraped_date < timedelta(days=7):
-                    score += cls.WEIGHTS['freshness']
-            except:
-                pass
+        if lead.get('scraped_at') and cls._is_fresh(lead['scraped_at']):
+            score += cls.WEIGHTS['freshness']
         
         return min(score, 100)
     
+    @classmethod
+    def _is_fresh(cls, scraped_at) -> bool:
+        """Whether scraped_at falls within the last 7 days"""
+        if isinstance(scraped_at, str) and _ISO_STAMP_RE.match(scraped_at):
+            # ISO-8601 sorts chronologically, so compare against a cutoff with the same separator
+            iso_cutoff, sql_cutoff = cls._fresh_cutoffs()
+            return scraped_at > (sql_cutoff if scraped_at[10] == ' ' else iso_cutoff)
+        
+        try:
+            if isinstance(scraped_at, str):
+                scraped_at = datetime.fromisoformat(scraped_at.replace('Z', '+00:00'))
+            return datetime.now() - scraped_at < timedelta(days=7)
+        except (TypeError, ValueError):
+            return False
+    
+    @classmethod
+    def _fresh_cutoffs(cls) -> Tuple[str, str]:
+        """ISO timestamps for 7 days ago, recomputed at most once a minute"""
+        now = time.monotonic()
+        if now - cls._cutoffs_at >= 60:
+            cutoff = datetime.now() - timedelta(days=7)
+            cls._cutoffs = (cutoff.isoformat(timespec='seconds'),
+                            cutoff.isoformat(sep=' ', timespec='seconds'))
+            cls._cutoffs_at = now
+        return cls._cutoffs
+    
+    @classmethod
+    def score_leads(cls, leads: Sequence[Dict]) -> np.ndarray:
+        """Score a batch of leads in one vectorized pass, using the same weights as score_lead"""
+        n = len(leads)
+        
+        def column(values) -> np.ndarray:
+            return np.fromiter(values, dtype=bool, count=n)
+        
+        has_phone = column(bool(lead.get('phone')) for lead in leads)
+        phone_valid = column(bool(lead.get('phone_valid')) for lead in leads)
+        has_email = column(bool(lead.get('email')) for lead in leads)
+        email_valid = column(bool(lead.get('email_valid')) for lead in leads)
+        has_website = column(bool(lead.get('website')) for lead in leads)
+        has_address = column(bool(lead.get('address')) for lead in leads)
+        has_social = column(
+            any(k in (lead.get('metadata') or {}) for k in cls.SOCIAL_KEYS) for lead in leads
+        )
+        is_fresh = cls._fresh_mask(leads)
+        
+        # One row per lead, one column per weighted signal, in FLAG_ORDER
+        flags = np.column_stack([
+            has_phone, has_phone & phone_valid, has_email, has_email & email_valid,
+            has_website, has_address, has_social, is_fresh
+        ])
+        weights = np.array([cls.WEIGHTS[name] for name in cls.FLAG_ORDER], dtype=np.int16)
+        
+        kernel = _score_kernel()
+        if kernel is not None:
+            return kernel(flags, weights)
+        return np.minimum(flags.astype(np.int16) @ weights, 100)
+    
+    @staticmethod
+    def _fresh_mask(leads: Sequence[Dict]) -> np.ndarray:
+        """True where scraped_at is within the last 7 days; missing or unparsable is False"""
+        stamps = []
+        for lead in leads:
+            scraped = lead.get('scraped_at')
+            if isinstance(scraped, datetime):
+                scraped = scraped.isoformat()
+            # Seconds-precision ISO prefix; any UTC offset suffix is ignored
+            stamps.append(scraped[:19] if isinstance(scraped, str) and scraped else 'NaT')
+        
+        try:
+            scraped_at = np.array(stamps, dtype='datetime64[s]')
+        except ValueError:
+            scraped_at = np.array([LeadScorer._parse_stamp(s) for s in stamps],
+                                  dtype='datetime64[s]')
+        
+        cutoff = np.datetime64(datetime.now() - timedelta(days=7), 's')
+        return scraped_at > cutoff
+    
+    @staticmethod
+    def _parse_stamp(stamp: str) -> np.datetime64:
+        """Parse one timestamp, NaT when it is not ISO-8601"""
+        try:
+            return np.datetime64(stamp, 's')
+        except ValueError:
+            return np.datetime64('NaT')
+    
     @classmethod
     def classify_lead(cls, score: int) -> str:
         """Classify lead quality based on score"""
@@ -16,15 +16,16 @@ def init_database():
     print("\n📦 Loading production sources...")
     loaded = 0
     skipped = 0
+    existing_names = {s['name'] for s in db.load_sources(enabled_only=False)}
     
     for source_config in PRODUCTION_SOURCES:
         try:
-            existing = db.load_sources(enabled_only=False)
-            if any(s['name'] == source_config['name'] for s in existing):
+            if source_config['name'] in existing_names:
                 print(f"  ⊘ Skipped (exists): {source_config['name']}")
                 skipped += 1
             else:
-                db.add_source(source_config)
+                db.add_source({**source_config, 'selectors': dict(source_config['selectors'])})
+                existing_names.add(source_config['name'])
                 print(f"  ✓ Loaded: {source_config['name']}")
                 loaded += 1
         except Exception as e:
@@ -1,9 +1,12 @@
 """CRM integration modules (HubSpot, Salesforce, etc.)"""
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 
+from utils import fast_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,14 +27,21 @@ class BaseCRM(ABC):
 class HubSpotCRM(BaseCRM):
     """HubSpot CRM integration"""
     
+    BATCH_SIZE = 100  # HubSpot's limit for batch/create
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.hubapi.com"
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
     
-    def create_contact(self, lead: Dict) -> Optional[str]:
-        """Create contact in HubSpot"""
-        url = f"{self.base_url}/crm/v3/objects/contacts"
-        
+    @staticmethod
+    def _contact_properties(lead: Dict) -> Dict:
+        """HubSpot contact properties for a lead, without empty values"""
         properties = {
             "email": lead.get('email'),
             "phone": lead.get('phone'),
@@ -41,29 +51,74 @@ class HubSpotCRM(BaseCRM):
             "state": lead.get('state'),
             "company": lead.get('business_name')
         }
+        return {k: v for k, v in properties.items() if v}
+    
+    def create_contact(self, lead: Dict) -> Optional[str]:
+        """Create contact in HubSpot"""
+        return self.create_contacts_batch([lead])[0]
+    
+    def create_contacts_batch(self, leads: List[Dict]) -> List[Optional[str]]:
+        """Create contacts BATCH_SIZE at a time; returns CRM IDs by position, None for failures"""
+        ids: List[Optional[str]] = []
+        for start in range(0, len(leads), self.BATCH_SIZE):
+            ids.extend(self._create_batch(leads[start:start + self.BATCH_SIZE]))
+        return ids
+    
+    def _create_batch(self, leads: List[Dict]) -> List[Optional[str]]:
+        """POST one batch/create request and match the created IDs back to leads.
         
-        properties = {k: v for k, v in properties.items() if v}
+        Each input carries its index as objectWriteTraceId. HubSpot does not
+        return results in input order, so IDs are matched by that trace ID,
+        then by email. 207 partial successes keep the IDs that were created.
+        A batch rejected outright (400/409) is split in half and retried, so
+        one invalid lead does not fail the other 99.
+        """
+        url = f"{self.base_url}/crm/v3/objects/contacts/batch/create"
+        inputs = [{"properties": self._contact_properties(lead), "objectWriteTraceId": str(idx)}
+                  for idx, lead in enumerate(leads)]
         
         try:
-            response = requests.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"properties": properties},
-                timeout=15
-            )
-            
-            if response.status_code == 201:
-                return response.json().get('id')
-            else:
-                logger.error(f"HubSpot creation failed: {response.text}")
-                return None
-                
+            response = self.session.post(url, data=fast_json.dumpb({"inputs": inputs}), timeout=30)
         except Exception as e:
             logger.error(f"HubSpot API error: {e}")
-            return None
+            return [None] * len(leads)
+        
+        if response.status_code in (400, 409) and len(leads) > 1:
+            middle = len(leads) // 2
+            return self._create_batch(leads[:middle]) + self._create_batch(leads[middle:])
+        
+        if response.status_code not in (201, 207):
+            logger.error(f"HubSpot creation failed: {response.text}")
+            return [None] * len(leads)
+        
+        body = fast_json.loads(response.content)
+        for error in body.get('errors', []):
+            logger.error(f"HubSpot contact rejected: {error.get('message')} "
+                         f"{error.get('context', {})}")
+        return self._match_results(inputs, body.get('results', []))
+    
+    @staticmethod
+    def _match_results(inputs: List[Dict], results: List[Dict]) -> List[Optional[str]]:
+        """CRM IDs in input order; None for inputs with no matching result"""
+        ids: List[Optional[str]] = [None] * len(inputs)
+        by_email = {}
+        for idx, item in enumerate(inputs):
+            email = item["properties"].get("email")
+            if email:
+                by_email.setdefault(email.lower(), idx)
+        
+        for result in results:
+            trace_id = result.get('objectWriteTraceId')
+            if trace_id is not None and trace_id.isdigit() and int(trace_id) < len(inputs):
+                idx = int(trace_id)
+            else:
+                email = (result.get('properties') or {}).get('email')
+                idx = by_email.get(email.lower()) if email else None
+                if idx is None and len(inputs) == 1:
+                    idx = 0
+            if idx is not None:
+                ids[idx] = result.get('id')
+        return ids
     
     def update_contact(self, crm_id: str, lead: Dict) -> bool:
         """Update contact in HubSpot"""
@@ -1,6 +1,17 @@
-from typing import Generator, Dict, Optional
-from core.base_scraper import BaseScraper
+"""Selector-driven scrapers whose parsers are generated from each source's CSS selectors"""
+from functools import lru_cache
+from typing import Callable, Generator, Dict, List, Optional, Tuple
+from core.base_scraper import BaseScraper, HTML_PARSER
+from utils.intern import intern
 from bs4 import BeautifulSoup
+import soupsieve as sv
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Selectors that find() can answer without going through the CSS engine
+_SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?$')
 
 
 class ExampleDirectScraper(BaseScraper):
@@ -8,6 +19,63 @@ class ExampleDirectScraper(BaseScraper):
     
     SOURCE_TYPE = "example_direct"
     
+    # (field, attribute) pairs in output order; None means element text
+    LEAD_FIELDS = (
+        ('business_name', None),
+        ('phone', None),
+        ('email', None),
+        ('website', 'href'),
+        ('address', None),
+        ('city', None),
+        ('state', None),
+        ('category', None),
+    )
+    
+    # Fields that repeat across listings and share one string object each
+    INTERNED_FIELDS = ('city', 'state', 'category')
+    
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self._selector_items = tuple(sorted(
+            (field, _normalize_selector(field, value)) for field, value in self.selectors.items()
+        ))
+        self._parse = self._build_parser(self._selector_items)
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _build_parser(selector_items: Tuple) -> Callable[..., Dict]:
+        """Generate a parse function specialized to the configured selectors.
+        
+        Unconfigured fields become None constants and each configured field
+        is one finder call, so the per-listing path has no lookups or branches
+        on the config. Selectors only reach the code as namespace bindings.
+        """
+        selectors = dict(selector_items)
+        namespace = {'_intern': intern}
+        body = []
+        items = []
+        
+        for idx, (field, attr) in enumerate(ExampleDirectScraper.LEAD_FIELDS):
+            if not selectors.get(field):
+                items.append(f"{field!r}: None")
+                continue
+            
+            namespace[f'_find{idx}'] = _finder(selectors[field])
+            extract = f"found.get({attr!r})" if attr else "found.get_text(strip=True)"
+            body.append(f"    found = _find{idx}(element)")
+            body.append(f"    v{idx} = {extract} if found is not None else None")
+            
+            value = f"v{idx}"
+            if field in ExampleDirectScraper.INTERNED_FIELDS:
+                value = f"_intern({value})"
+            items.append(f"{field!r}: {value}")
+        
+        source = "def _parse(element):\n"
+        source += "".join(line + "\n" for line in body)
+        source += "    return {" + ", ".join(items) + "}\n"
+        exec(compile(source, f"<{ExampleDirectScraper.SOURCE_TYPE} parser>", "exec"), namespace)
+        return namespace['_parse']
+    
     def scrape(self) -> Generator[Dict, None, None]:
         """Scrape leads from a direct listing page"""
         response = self._make_request(self.base_url)
@@ -15,53 +83,89 @@ class ExampleDirectScraper(BaseScraper):
         if not response:
             return
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        listings = soup.select(self.selectors.get('listing_container', '.listing'))
-        
-        for listing in listings:
-            lead = self.parse_lead(listing)
+        for lead in self._parse_page(parse_listing_page, self._selector_items, response.content):
             if lead:
                 yield lead
     
     def parse_lead(self, element) -> Optional[Dict]:
         """Parse individual lead"""
         try:
-            lead = {
-                'business_name': self._extract_text(element, self.selectors.get('business_name')),
-                'phone': self._extract_text(element, self.selectors.get('phone')),
-                'email': self._extract_text(element, self.selectors.get('email')),
-                'website': self._extract_attr(element, self.selectors.get('website'), 'href'),
-                'address': self._extract_text(element, self.selectors.get('address')),
-                'city': self._extract_text(element, self.selectors.get('city')),
-                'state': self._extract_text(element, self.selectors.get('state')),
-                'category': self._extract_text(element, self.selectors.get('category')),
-            }
-            
-            return lead
+            return self._parse(element)
         
         except Exception as e:
             self.logger.warning(f"Failed to parse lead: {e}")
             return None
+
+
+def _normalize_selector(field: str, value) -> Optional[str]:
+    """Selector config value as a string, so selector items stay hashable for the parser cache.
     
-    def _extract_text(self, element, selector: Optional[str]) -> Optional[str]:
-        """Extract text from element"""
-        if not selector:
-            return None
-        
-        try:
-            found = element.select_one(selector)
-            return found.get_text(strip=True) if found else None
-        except:
-            return None
+    A list from JSON config becomes a CSS selector group; other non-strings are dropped.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)) and all(isinstance(part, str) for part in value):
+        return ', '.join(value)
+    logger.warning(f"Ignoring non-string selector for {field!r}: {value!r}")
+    return None
+
+
+def _find_nothing(element) -> None:
+    return None
+
+
+def _finder(selector: str) -> Callable:
+    """Element lookup for a selector: find() for 'tag', '.class' or 'tag.class', else a compiled matcher.
     
-    def _extract_attr(self, element, selector: Optional[str], 
-                     attr: str = 'href') -> Optional[str]:
-        """Extract attribute from element"""
-        if not selector:
-            return None
-        
+    A blank or malformed selector logs a warning and finds nothing, so one bad
+    field doesn't take the rest of the source down with it.
+    """
+    selector = selector.strip()
+    if not selector:
+        # The simple-selector pattern matches '', which would find() the first tag
+        logger.warning("Empty selector, field will be left empty")
+        return _find_nothing
+    
+    match = _SIMPLE_SELECTOR_RE.match(selector)
+    if match:
+        tag, class_name = match.groups()
+        if class_name:
+            return lambda element: element.find(tag, class_=class_name)
+        return lambda element: element.find(tag)
+    
+    try:
+        return _compile_selector(selector).select_one
+    except sv.SelectorSyntaxError as e:
+        logger.warning(f"Invalid selector {selector!r}, field will be left empty: {e}")
+        return _find_nothing
+
+
+@lru_cache(maxsize=256)
+def _compile_selector(selector: str) -> sv.SoupSieve:
+    """Compile a CSS selector once and reuse the matcher for every listing"""
+    return sv.compile(selector)
+
+
+def parse_listing_page(selector_items: Tuple, content: bytes) -> List[Optional[Dict]]:
+    """Parse a listing page with a source's selectors.
+    
+    Module-level so it can be pickled into the engine's parse pool.
+    """
+    selectors = dict(selector_items)
+    parse = ExampleDirectScraper._build_parser(selector_items)
+    
+    try:
+        container = _compile_selector(selectors.get('listing_container') or '.listing')
+    except sv.SelectorSyntaxError as e:
+        logger.warning(f"Invalid listing_container selector: {e}")
+        return []
+    
+    soup = BeautifulSoup(content, HTML_PARSER)
+    leads = []
+    for listing in container.select(soup):
         try:
-            found = element.select_one(selector)
-            return found.get(attr) if found else None
-        except:
-            return None
+            leads.append(parse(listing))
+        except Exception as e:
+            logger.warning(f"Failed to parse lead: {e}")
+            leads.append(None)
+    return leads
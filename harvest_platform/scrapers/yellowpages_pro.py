@@ -1,14 +1,25 @@
-from typing import Generator, Dict, Optional
-from core.base_scraper import BaseScraper
+from typing import Generator, Dict, List, Optional
+from core.base_scraper import BaseScraper, HTML_PARSER
 from utils.advanced_anti_detection import AdvancedAntiDetection, ProxyManager
-from bs4 import BeautifulSoup
+from utils.intern import intern
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import random
 import logging
+import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGES = 5
+
+# Only result listings are built into the tree; ads and navigation are skipped by the parser.
+# The strainer sees the raw class attribute, so match 'result' as one whitespace-separated word.
+_RESULT_STRAINER = SoupStrainer(class_=re.compile(r'(?:^|\s)result(?:\s|$)'))
+
+
 class YellowPagesProScraper(BaseScraper):
     SOURCE_TYPE = "yellowpages_pro"
     
@@ -18,77 +29,124 @@ class YellowPagesProScraper(BaseScraper):
         logger.info("Loading proxies...")
         self.proxy_manager.fetch_free_proxies()
         self.current_proxy = None
+        # Own keep-alive session without urllib3 retries: failures rotate to another proxy instead
+        self.session = requests.Session()
+        adapter = HTTPAdapter(max_retries=0, pool_connections=8, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._slot_lock = threading.Lock()
+        self._next_slot = 0.0
     
-    def _make_request_with_rotation(self, url: str, attempt: int = 1):
-        if attempt > 5:
-            return None
+    def _make_request_with_rotation(self, url: str, max_attempts: int = 5):
+        # Page fetches run concurrently, so each call rotates its own proxy
+        proxy = self.current_proxy
         
-        if not self.current_proxy or attempt > 1:
-            self.current_proxy = self.proxy_manager.get_working_proxy()
-            if not self.current_proxy:
+        for attempt in range(max_attempts):
+            if self._stopped.is_set():
                 return None
-        
-        headers = AdvancedAntiDetection.get_realistic_headers()
-        
-        try:
-            response = requests.get(url, headers=headers, proxies=self.current_proxy, timeout=30)
             
-            if response.status_code == 403:
-                self.proxy_manager.mark_proxy_failed(self.current_proxy)
-                time.sleep(3)
-                return self._make_request_with_rotation(url, attempt + 1)
+            if not proxy or attempt > 0:
+                proxy = self.proxy_manager.get_working_proxy()
+                if not proxy:
+                    return None
+                self.current_proxy = proxy
+            
+            headers = AdvancedAntiDetection.get_realistic_headers()
+            
+            try:
+                response = self.session.get(url, headers=headers, proxies=proxy, timeout=30)
+            except requests.exceptions.RequestException:
+                self.proxy_manager.mark_proxy_failed(proxy)
+                self._stopped.wait(2)
+                continue
             
             if response.status_code == 200:
-                AdvancedAntiDetection.human_delay(3, 7)
+                # Same pause as human_delay(3, 7), but cut short when the scrape stops
+                self._stopped.wait(random.uniform(3, 7))
                 return response
             
-            time.sleep(2)
-            return self._make_request_with_rotation(url, attempt + 1)
-            
-        except:
-            self.proxy_manager.mark_proxy_failed(self.current_proxy)
-            time.sleep(2)
-            return self._make_request_with_rotation(url, attempt + 1)
+            if response.status_code == 403:
+                self.proxy_manager.mark_proxy_failed(proxy)
+                self._stopped.wait(3)
+            else:
+                self._stopped.wait(2)
+        
+        return None
+    
+    def _page_url(self, page: int) -> str:
+        return self.base_url if page == 1 else f"{self.base_url}{'&' if '?' in self.base_url else '?'}page={page}"
+    
+    def _wait_for_page_slot(self):
+        # Page requests start 5-10s apart even while several are in flight
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + random.uniform(5, 10)
+        
+        if slot > now:
+            self._stopped.wait(slot - now)
+    
+    def _fetch_page(self, url: str):
+        if self._stopped.is_set():
+            return None
+        self._wait_for_page_slot()
+        if self._stopped.is_set():
+            return None
+        return self._make_request_with_rotation(url)
     
     def scrape(self) -> Generator[Dict, None, None]:
-        for page in range(1, 6):
-            url = self.base_url if page == 1 else f"{self.base_url}{'&' if '?' in self.base_url else '?'}page={page}"
-            
-            response = self._make_request_with_rotation(url)
-            if not response:
-                break
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            listings = soup.select('.result, .search-results .result')
-            
-            if not listings:
-                break
-            
-            for listing in listings:
-                lead = self.parse_lead(listing)
-                if lead:
-                    yield lead
-                time.sleep(random.uniform(0.3, 1.0))
-            
-            if page < 5:
-                time.sleep(random.uniform(5, 10))
+        urls = [self._page_url(page) for page in range(1, MAX_PAGES + 1)]
+        
+        # Later pages download while earlier ones are parsed and yielded; results stay in page order
+        pages = self.fetch_many(urls, self._fetch_page)
+        try:
+            for response in pages:
+                if not response:
+                    break
+                
+                listings = self._parse_page(parse_results_page, response.content)
+                
+                if not listings:
+                    break
+                
+                # Listings all come from one downloaded page, so there is nothing to pace here
+                for lead in listings:
+                    if lead:
+                        yield lead
+        finally:
+            pages.close()
     
     def parse_lead(self, element) -> Optional[Dict]:
-        try:
-            name_elem = element.select_one('.business-name, h2.business-name, h2 a')
-            if not name_elem:
-                return None
-            
-            phone_elem = element.select_one('.phones, .phone')
-            city_elem = element.select_one('.locality')
-            state_elem = element.select_one('.region')
-            
-            return {
-                'business_name': name_elem.get_text(strip=True),
-                'phone': phone_elem.get_text(strip=True) if phone_elem else None,
-                'city': city_elem.get_text(strip=True) if city_elem else None,
-                'state': state_elem.get_text(strip=True) if state_elem else None,
-                'category': 'Yellow Pages'
-            }
-        except:
-            return None
\ No newline at end of file
+        return _parse_result(element)
+
+
+def parse_results_page(content: bytes) -> List[Optional[Dict]]:
+    """Parse every result on a page; module-level so the parse pool can pickle it"""
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=_RESULT_STRAINER)
+    return [_parse_result(listing) for listing in soup.find_all(class_='result')]
+
+
+def _parse_result(element) -> Optional[Dict]:
+    """Parse a single result element into a lead"""
+    try:
+        name_elem = element.find(class_='business-name')
+        if not name_elem:
+            heading = element.find('h2')
+            name_elem = heading.find('a') if heading else None
+        if not name_elem:
+            return None
+        
+        phone_elem = element.find(class_=['phones', 'phone'])
+        city_elem = element.find(class_='locality')
+        state_elem = element.find(class_='region')
+        
+        return {
+            'business_name': name_elem.get_text(strip=True),
+            'phone': phone_elem.get_text(strip=True) if phone_elem else None,
+            'city': intern(city_elem.get_text(strip=True)) if city_elem else None,
+            'state': intern(state_elem.get_text(strip=True)) if state_elem else None,
+            'category': 'Yellow Pages'
+        }
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to parse result: {e}")
+        return None
\ No newline at end of file
@@ -0,0 +1,308 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from core import db as db_module
+from core.db import DatabaseManager
+
+SOURCE = {
+    'name': 'Test Source',
+    'source_type': 'example_direct',
+    'base_url': 'http://example.com/list',
+    'pagination_type': 'direct',
+    'selectors': {'listing_container': '.listing'},
+}
+
+# Tables as created before dedup_hash, ON DELETE CASCADE and source-scoped http_cache
+LEGACY_SCHEMA = """
+CREATE TABLE sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    source_type TEXT NOT NULL,
+    base_url TEXT NOT NULL,
+    pagination_type TEXT NOT NULL,
+    selectors TEXT NOT NULL,
+    rate_limit_delay REAL DEFAULT 3.0,
+    proxy_config TEXT,
+    enabled BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE leads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id INTEGER NOT NULL,
+    business_name TEXT NOT NULL,
+    city TEXT,
+    state TEXT,
+    phone TEXT,
+    email TEXT,
+    website TEXT,
+    address TEXT,
+    category TEXT,
+    metadata TEXT,
+    score INTEGER DEFAULT 0,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (source_id) REFERENCES sources(id),
+    UNIQUE(business_name, city, phone)
+);
+CREATE TABLE scraper_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    leads_scraped INTEGER DEFAULT 0,
+    error_message TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP,
+    FOREIGN KEY (source_id) REFERENCES sources(id)
+);
+CREATE TABLE scheduled_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT UNIQUE NOT NULL,
+    source_id INTEGER NOT NULL,
+    schedule_type TEXT NOT NULL,
+    schedule_config TEXT NOT NULL,
+    max_leads INTEGER,
+    enabled BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (source_id) REFERENCES sources(id)
+);
+CREATE TABLE http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Gives each test its own database file and DatabaseManager singleton"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = str(Path(self.tmpdir) / 'harvest.db')
+        DatabaseManager._instance = None
+    
+    def tearDown(self):
+        if DatabaseManager._instance is not None:
+            DatabaseManager._instance.close_all()
+        DatabaseManager._instance = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+    
+    def open_db(self) -> DatabaseManager:
+        return DatabaseManager(self.db_path)
+    
+    def raw(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        self.addCleanup(conn.close)
+        return conn
+
+
+class MigrationTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.execute("INSERT INTO sources (name, source_type, base_url, pagination_type, selectors) "
+                     "VALUES ('Legacy', 'example_direct', 'http://example.com', 'direct', '{}')")
+        # Distinct under the old UNIQUE constraint, equal once name, city and phone are normalized
+        conn.executemany(
+            "INSERT INTO leads (source_id, business_name, city, phone) VALUES (1, ?, ?, ?)",
+            [('Acme Plumbing', 'Austin', '555-111-2222'),
+             ('acme plumbing ', 'AUSTIN', '(555) 111 2222'),
+             ('Bolt Electric', 'Reno', None)]
+        )
+        conn.execute("INSERT INTO scraper_logs (source_id, status) VALUES (1, 'success')")
+        conn.execute("INSERT INTO scheduled_jobs (job_id, source_id, schedule_type, schedule_config) "
+                     "VALUES ('daily_1_0900', 1, 'daily', '{}')")
+        conn.execute("INSERT INTO http_cache (url, etag, body) VALUES ('http://example.com', '\"x\"', x'00')")
+        conn.commit()
+        conn.close()
+    
+    def test_dedup_hash_backfilled_and_collisions_kept_with_null_hash(self):
+        self.open_db()
+        rows = self.raw().execute(
+            "SELECT business_name, city, phone, dedup_hash FROM leads ORDER BY id").fetchall()
+        
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['dedup_hash'],
+                         DatabaseManager.lead_key('Acme Plumbing', 'Austin', '555-111-2222'))
+        self.assertIsNone(rows[1]['dedup_hash'])
+        self.assertEqual(rows[2]['dedup_hash'], DatabaseManager.lead_key('Bolt Electric', 'Reno', None))
+    
+    def test_migrated_dedup_hash_rejects_normalized_duplicates(self):
+        db = self.open_db()
+        self.assertIsNone(db.save_lead(1, {'business_name': 'ACME Plumbing', 'city': 'austin',
+                                           'phone': '5551112222'}))
+        self.assertIsNotNone(db.save_lead(1, {'business_name': 'Acme Plumbing', 'city': 'Dallas',
+                                              'phone': '5551112222'}))
+    
+    def test_child_tables_cascade_on_source_delete(self):
+        db = self.open_db()
+        conn = self.raw()
+        for table in ('leads', 'scraper_logs', 'scheduled_jobs', 'http_cache'):
+            on_delete = {fk['on_delete'] for fk in conn.execute(f"PRAGMA foreign_key_list({table})")}
+            self.assertEqual(on_delete, {'CASCADE'}, table)
+        
+        db.save_http_cache('http://example.com/?page=2', '"y"', None, b'body', source_id=1)
+        db.delete_source(1)
+        for table in ('leads', 'scraper_logs', 'scheduled_jobs', 'http_cache'):
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 0, table)
+    
+    def test_legacy_http_cache_is_dropped(self):
+        db = self.open_db()
+        columns = {row['name'] for row in self.raw().execute("PRAGMA table_info(http_cache)")}
+        self.assertIn('source_id', columns)
+        self.assertIsNone(db.get_http_cache('http://example.com'))
+    
+    def test_migration_runs_once(self):
+        self.open_db().close_all()
+        DatabaseManager._instance = None
+        self.open_db()
+        self.assertEqual(self.raw().execute("SELECT COUNT(*) FROM leads").fetchone()[0], 3)
+
+
+class LeadStorageTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open_db()
+        self.source_id = self.db.add_source(SOURCE)
+    
+    def test_bulk_save_counts_saved_and_duplicates(self):
+        leads = [
+            {'business_name': 'Acme', 'city': 'Austin', 'phone': '555-111-2222'},
+            {'business_name': 'ACME ', 'city': 'austin', 'phone': '(555) 111-2222'},
+            {'business_name': 'Bolt', 'city': 'Reno', 'phone': '555-999-0000'},
+        ]
+        with self.db.bulk_save_context(self.source_id) as flush:
+            self.assertEqual(flush(leads), {'saved': 2, 'duplicates': 1})
+            self.assertEqual(flush(leads[2:]), {'saved': 0, 'duplicates': 1})
+            self.assertEqual(flush([]), {'saved': 0, 'duplicates': 0})
+        
+        self.assertEqual(self.db.count_leads(), 2)
+    
+    def test_bulk_save_counts_ignore_fts_trigger_writes(self):
+        leads = [{'business_name': f'Biz {i}', 'city': 'Austin', 'phone': str(i)} for i in range(25)]
+        with self.db.bulk_save_context(self.source_id, commit_every=2) as flush:
+            self.assertEqual(flush(leads[:10]), {'saved': 10, 'duplicates': 0})
+            self.assertEqual(flush(leads), {'saved': 15, 'duplicates': 10})
+        self.assertEqual(self.db.count_leads(), 25)
+    
+    def test_bulk_save_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.bulk_save_context(self.source_id, commit_every=10) as flush:
+                flush([{'business_name': 'Lost', 'city': 'Austin', 'phone': '1'}])
+                raise RuntimeError
+        self.assertEqual(self.db.count_leads(), 0)
+    
+    def test_get_leads_summary_returns_tuples_in_column_order(self):
+        self.db.bulk_save_leads(self.source_id, [
+            {'business_name': 'Acme', 'city': 'Austin', 'phone': '1', 'score': 70},
+            {'business_name': 'Bolt', 'city': 'Reno', 'phone': '2', 'score': 20},
+        ])
+        
+        rows = self.db.get_leads_summary(columns=('business_name', 'score'))
+        self.assertEqual(sorted(rows), [('Acme', 70), ('Bolt', 20)])
+        self.assertIsInstance(rows[0], tuple)
+        
+        self.assertEqual(self.db.get_leads_summary(min_score=50, columns=('business_name',)),
+                         [('Acme',)])
+        self.assertEqual(self.db.get_leads_summary(source_id=self.source_id + 1), [])
+        self.assertEqual(len(self.db.get_leads_summary(limit=1, offset=1)), 1)
+    
+    def test_update_lead_scores(self):
+        self.db.bulk_save_leads(self.source_id, [
+            {'business_name': 'Acme', 'city': 'Austin', 'phone': '1'},
+            {'business_name': 'Bolt', 'city': 'Reno', 'phone': '2'},
+        ])
+        ids = {lead['business_name']: lead['id'] for lead in self.db.get_leads()}
+        version = self.db.get_version()
+        
+        self.assertEqual(self.db.update_lead_scores([(ids['Acme'], 55), (ids['Bolt'], 10)]), 2)
+        self.assertEqual(self.db.update_lead_scores([]), 0)
+        scores = {lead['business_name']: lead['score'] for lead in self.db.get_leads()}
+        self.assertEqual(scores, {'Acme': 55, 'Bolt': 10})
+        self.assertGreater(self.db.get_version(), version)
+
+
+class SearchLeadsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open_db()
+        self.source_id = self.db.add_source(SOURCE)
+        self.db.bulk_save_leads(self.source_id, [
+            {'business_name': 'Acme Plumbing', 'city': 'Austin', 'phone': '1',
+             'address': '1 Main St', 'category': 'Plumbers'},
+            {'business_name': 'Bolt Electric', 'city': 'Reno', 'phone': '2',
+             'address': '9 Oak Ave', 'category': 'Electricians'},
+            {'business_name': 'Acme Roofing', 'city': 'Austin', 'phone': '3',
+             'address': '5 Main St', 'category': 'Roofers'},
+        ])
+    
+    def names(self, query):
+        return sorted(lead['business_name'] for lead in self.db.search_leads(query))
+    
+    def test_matches_name_address_and_category(self):
+        self.assertEqual(self.names('acme'), ['Acme Plumbing', 'Acme Roofing'])
+        self.assertEqual(self.names('oak'), ['Bolt Electric'])
+        self.assertEqual(self.names('plumbers'), ['Acme Plumbing'])
+    
+    def test_every_word_must_match_as_prefix(self):
+        self.assertEqual(self.names('acme main roof'), ['Acme Roofing'])
+        self.assertEqual(self.names('elec'), ['Bolt Electric'])
+        self.assertEqual(self.names('acme oak'), [])
+    
+    @unittest.skipUnless(db_module.HAS_FTS5, "SQLite built without FTS5")
+    def test_fts_syntax_in_input_is_treated_as_text(self):
+        # A stray quote is neither a syntax error nor part of the word
+        self.assertEqual(self.names('"acme'), ['Acme Plumbing', 'Acme Roofing'])
+        self.assertEqual(self.names('acme OR bolt'), [])
+        self.assertEqual(self.names('   '), [])
+    
+    @unittest.skipUnless(db_module.HAS_FTS5, "SQLite built without FTS5")
+    def test_index_follows_updates_and_deletes(self):
+        conn = self.db._connect()
+        self.addCleanup(conn.close)
+        conn.execute("UPDATE leads SET business_name = 'Zenith Plumbing' WHERE business_name = 'Acme Plumbing'")
+        self.assertEqual(self.names('acme'), ['Acme Roofing'])
+        self.assertEqual(self.names('zenith'), ['Zenith Plumbing'])
+        
+        self.db.delete_source(self.source_id)
+        self.assertEqual(self.names('zenith'), [])
+    
+    def test_limit(self):
+        self.assertEqual(len(self.db.search_leads('acme', limit=1)), 1)
+
+
+class HttpCacheTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open_db()
+        self.source_id = self.db.add_source(SOURCE)
+    
+    def test_round_trip(self):
+        self.db.save_http_cache('http://a', '"e"', 'Mon, 01 Jan 2024 00:00:00 GMT', b'<html>',
+                                source_id=self.source_id)
+        self.assertEqual(self.db.get_http_cache('http://a'),
+                         {'etag': '"e"', 'last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+                          'body': b'<html>'})
+    
+    def test_evicts_oldest_entries_periodically(self):
+        original = db_module.HTTP_CACHE_MAX_ENTRIES, db_module.HTTP_CACHE_EVICT_EVERY
+        self.addCleanup(setattr, db_module, 'HTTP_CACHE_MAX_ENTRIES', original[0])
+        self.addCleanup(setattr, db_module, 'HTTP_CACHE_EVICT_EVERY', original[1])
+        db_module.HTTP_CACHE_MAX_ENTRIES, db_module.HTTP_CACHE_EVICT_EVERY = 3, 5
+        
+        counts = []
+        for i in range(5):
+            self.db.save_http_cache(f'http://a/{i}', '"e"', None, b'x', source_id=self.source_id)
+            counts.append(self.raw().execute("SELECT COUNT(*) FROM http_cache").fetchone()[0])
+        self.assertEqual(counts, [1, 2, 3, 4, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from utils import fast_json
+from utils.export import DataExporter
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+def make_leads(n):
+    return [
+        {'id': i, 'business_name': f'Biz {i}, "Inc"', 'city': 'Austin', 'state': 'TX',
+         'phone': f'555-000-{i:04d}', 'email': None, 'website': 'http://b.com',
+         'address': '1 Main St\nSuite 2', 'category': 'Plumbers', 'score': i % 100,
+         'scraped_at': '2024-01-02 03:04:05', 'metadata': {'source': 'test', 'rank': i}}
+        for i in range(n)
+    ]
+
+
+class CsvExportTest(unittest.TestCase):
+    def parse(self, text):
+        return list(csv.reader(io.StringIO(text)))
+    
+    def test_header_and_rows(self):
+        rows = self.parse(DataExporter.to_csv(make_leads(3)))
+        
+        self.assertEqual(rows[0], DataExporter.CSV_COLUMNS)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1], ['0', 'Biz 0, "Inc"', 'Austin', 'TX', '555-000-0000', '',
+                                   'http://b.com', '1 Main St\nSuite 2', 'Plumbers', '0',
+                                   '2024-01-02 03:04:05'])
+    
+    def test_metadata_column_is_compact_json(self):
+        rows = self.parse(DataExporter.to_csv(make_leads(2), include_metadata=True))
+        
+        self.assertEqual(rows[0][-1], 'metadata')
+        self.assertEqual(rows[2][-1], '{"source":"test","rank":1}')
+    
+    def test_missing_columns_are_blank(self):
+        rows = self.parse(DataExporter.to_csv([{'business_name': 'Only name'}], include_metadata=True))
+        self.assertEqual(rows[1], ['', 'Only name'] + [''] * 10)
+    
+    def test_chunks_join_to_the_full_export(self):
+        leads = make_leads(7)
+        chunks = list(DataExporter.iter_csv(iter(leads), rows_per_chunk=3))
+        
+        # Header and rows 1-3, rows 4-6, then the remainder
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks), DataExporter.to_csv(leads))
+        self.assertEqual(b''.join(DataExporter.to_csv_stream(leads, rows_per_chunk=3)),
+                         DataExporter.to_csv(leads).encode('utf-8'))
+    
+    def test_empty(self):
+        self.assertEqual(DataExporter.to_csv([]), "")
+        self.assertEqual(self.parse(''.join(DataExporter.iter_csv([]))), [DataExporter.CSV_COLUMNS])
+
+
+class JsonExportTest(unittest.TestCase):
+    def test_stream_matches_to_json(self):
+        leads = make_leads(5)
+        for per_chunk in (1, 2, 500):
+            streamed = b''.join(DataExporter.to_json_stream(iter(leads), leads_per_chunk=per_chunk))
+            self.assertEqual(json.loads(streamed), leads)
+            self.assertEqual(streamed.decode('utf-8'), DataExporter.to_json(leads))
+    
+    def test_empty_stream_is_an_empty_array(self):
+        self.assertEqual(json.loads(b''.join(DataExporter.to_json_stream([]))), [])
+    
+    def test_datetimes_written_as_iso(self):
+        lead = {'business_name': 'A', 'scraped_at': datetime(2024, 1, 2, 3, 4, 5)}
+        streamed = b''.join(DataExporter.to_json_stream([lead]))
+        self.assertEqual(json.loads(streamed)[0]['scraped_at'], '2024-01-02T03:04:05')
+    
+    def test_stdlib_fallback_matches_orjson_layout(self):
+        value = {'a': [1, 2], 'b': {'c': 'é'}, 'when': datetime(2024, 1, 2, 3, 4, 5)}
+        with mock.patch.object(fast_json, 'orjson', None):
+            compact = fast_json.dumps(value)
+            pretty = fast_json.dumps(value, indent=True)
+        
+        self.assertEqual(compact, '{"a":[1,2],"b":{"c":"é"},"when":"2024-01-02T03:04:05"}')
+        self.assertEqual(json.loads(pretty), json.loads(compact))
+        if fast_json.orjson is not None:
+            self.assertEqual(compact, fast_json.dumps(value))
+            self.assertEqual(pretty, fast_json.dumps(value, indent=True))
+
+
+@unittest.skipIf(openpyxl is None, "openpyxl not installed")
+class ExcelExportTest(unittest.TestCase):
+    def test_rows_round_trip(self):
+        leads = make_leads(3)
+        buffer = DataExporter.to_excel_buffer(iter(leads))
+        
+        sheet = openpyxl.load_workbook(buffer, read_only=True)['Leads']
+        rows = list(sheet.iter_rows(values_only=True))
+        
+        self.assertEqual(rows[0][:2], ('ID', 'Business Name'))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[2], (1, 'Biz 1, "Inc"', 'Austin', 'TX', '555-000-0001', None,
+                                   'http://b.com', '1 Main St\nSuite 2', 'Plumbers', 1,
+                                   '2024-01-02 03:04:05'))
+    
+    def test_rows_past_the_width_sample_are_written(self):
+        buffer = DataExporter.to_excel_buffer(iter(make_leads(7)), width_sample=2)
+        sheet = openpyxl.load_workbook(buffer, read_only=True)['Leads']
+        self.assertEqual(len(list(sheet.iter_rows(values_only=True))), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from core import scoring
+from core.scoring import LeadScorer
+from utils.scoring_numba import HAS_NUMBA
+
+
+def sample_leads():
+    fresh = (datetime.now() - timedelta(days=1)).isoformat(sep=' ', timespec='seconds')
+    stale = (datetime.now() - timedelta(days=30)).isoformat(timespec='seconds')
+    return [
+        {'business_name': 'Empty'},
+        {'business_name': 'Phone', 'phone': '555-111-2222', 'phone_valid': True},
+        {'business_name': 'Invalid flags only', 'phone_valid': True, 'email_valid': True},
+        {'business_name': 'Full', 'phone': '5551112222', 'phone_valid': True,
+         'email': 'a@b.com', 'email_valid': True, 'website': 'http://b.com',
+         'address': '1 Main St', 'metadata': {'linkedin': 'x'}, 'scraped_at': fresh},
+        {'business_name': 'Stale', 'email': 'a@b.com', 'scraped_at': stale},
+        {'business_name': 'Bad stamp', 'website': 'http://c.com', 'scraped_at': 'yesterday'},
+        {'business_name': 'Datetime', 'address': 'x', 'scraped_at': datetime.now()},
+        {'business_name': 'No metadata', 'metadata': None, 'phone': '1'},
+    ]
+
+
+class ScoreLeadsTest(unittest.TestCase):
+    def test_numpy_path_matches_score_lead(self):
+        leads = sample_leads()
+        with mock.patch.object(scoring, '_score_kernel', lambda: None):
+            scores = LeadScorer.score_leads(leads)
+        expected = [LeadScorer.score_lead({**lead, 'metadata': lead.get('metadata') or {}})
+                    for lead in leads]
+        self.assertEqual(scores.tolist(), expected)
+    
+    def test_scores_are_capped_at_100(self):
+        with mock.patch.dict(LeadScorer.WEIGHTS, {'has_phone': 90, 'has_email': 90}):
+            with mock.patch.object(scoring, '_score_kernel', lambda: None):
+                scores = LeadScorer.score_leads([{'phone': '1', 'email': 'e'}])
+        self.assertEqual(scores.tolist(), [100])
+    
+    @unittest.skipUnless(HAS_NUMBA, "numba not installed")
+    def test_kernel_matches_numpy_path(self):
+        from utils.scoring_numba import score_kernel
+        
+        rng = np.random.default_rng(0)
+        flags = rng.random((500, len(LeadScorer.FLAG_ORDER))) < 0.5
+        weights = np.array([LeadScorer.WEIGHTS[name] for name in LeadScorer.FLAG_ORDER],
+                           dtype=np.int16)
+        
+        numpy_scores = np.minimum(flags.astype(np.int16) @ weights, 100)
+        self.assertEqual(score_kernel(flags, weights).tolist(), numpy_scores.tolist())
+    
+    def test_score_leads_uses_whichever_path_is_available(self):
+        leads = sample_leads()
+        with mock.patch.object(scoring, '_score_kernel', lambda: None):
+            numpy_scores = LeadScorer.score_leads(leads)
+        self.assertEqual(LeadScorer.score_leads(leads).tolist(), numpy_scores.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
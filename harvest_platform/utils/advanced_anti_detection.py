@@ -1,16 +1,37 @@
 import random
+import re
+import threading
 import time
 import requests
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Dict
 import logging
 
 logger = logging.getLogger(__name__)
 
+_choice = random.choice
+_choices = random.choices
+_uniform = random.uniform
+
+# Proxy health checks run this many at a time, over batches of this many candidates
+PROXY_TEST_WORKERS = 64
+PROXY_TEST_BATCH = 256
+WORKING_PROXY_TARGET = 10
+MAX_FAILED_PROXIES = 10_000
+
+# One 'ip:port' per line, matched over the raw response bytes in a single pass
+_PROXY_LINE_RE = re.compile(rb'^[ \t]*(\d{1,3}(?:\.\d{1,3}){3}:\d{2,5})[ \t\r]*$', re.MULTILINE)
+
 class ProxyManager:
     def __init__(self):
-        self.proxies = []
-        self.working_proxies = []
-        self.failed_proxies = set()
+        self.proxies = deque()
+        # Dicts used as ordered sets: O(1) add, remove and membership
+        self.working_proxies: Dict[str, None] = {}
+        # Least recently failed first; capped so long sessions do not grow it forever
+        self.failed_proxies: OrderedDict = OrderedDict()
+        # Scrapers fetch pages from several threads; one of them refills the pool at a time
+        self._lock = threading.RLock()
     
     def fetch_free_proxies(self):
         sources = [
@@ -24,16 +45,14 @@ class ProxyManager:
             try:
                 response = requests.get(source, timeout=10)
                 if response.status_code == 200:
-                    proxies = response.text.strip().split('\n')
-                    for proxy in proxies:
-                        proxy = proxy.strip()
-                        if proxy and ':' in proxy:
-                            all_proxies.add(proxy)
+                    all_proxies.update(match.decode('ascii')
+                                       for match in _PROXY_LINE_RE.findall(response.content))
             except:
                 pass
         
-        self.proxies = list(all_proxies)
+        self.proxies = deque(all_proxies)
         logger.info(f"Loaded {len(self.proxies)} proxies")
+        self.validate_proxies()
         return len(self.proxies)
     
     def test_proxy(self, proxy: str) -> bool:
@@ -44,46 +63,86 @@ class ProxyManager:
         except:
             return False
     
-    def get_working_proxy(self) -> Optional[Dict]:
-        if self.working_proxies:
-            proxy = random.choice(self.working_proxies)
-            return {'http': f'http://{proxy}', 'https': f'http://{proxy}'}
+    def validate_proxies(self, batch_size: int = PROXY_TEST_BATCH,
+                         target: int = WORKING_PROXY_TARGET) -> int:
+        # Test the next batch concurrently and keep the first `target` that answer
+        batch = []
+        while self.proxies and len(batch) < batch_size:
+            proxy = self.proxies.popleft()
+            if proxy not in self.failed_proxies:
+                batch.append(proxy)
+        if not batch:
+            return 0
         
-        if not self.proxies:
-            self.fetch_free_proxies()
+        found = 0
+        checked = set()
+        # Leaving the block waits for tests already running (5s timeout each), so none outlive the call
+        with ThreadPoolExecutor(max_workers=min(PROXY_TEST_WORKERS, len(batch))) as executor:
+            futures = {executor.submit(self.test_proxy, proxy): proxy for proxy in batch}
+            try:
+                for future in as_completed(futures):
+                    proxy = futures[future]
+                    checked.add(proxy)
+                    if future.result():
+                        self.working_proxies[proxy] = None
+                        found += 1
+                        if found >= target:
+                            break
+                    else:
+                        self._remember_failed(proxy)
+            finally:
+                # cancel_futures= needs 3.9; cancel the queued tests by hand instead
+                for future in futures:
+                    future.cancel()
         
-        tested = 0
-        while tested < 10 and self.proxies:
-            proxy = self.proxies.pop(0)
-            if proxy not in self.failed_proxies:
-                if self.test_proxy(proxy):
-                    self.working_proxies.append(proxy)
-                    return {'http': f'http://{proxy}', 'https': f'http://{proxy}'}
-                self.failed_proxies.add(proxy)
-            tested += 1
-        return None
+        # Candidates we stopped waiting for go back to the front of the queue
+        self.proxies.extendleft(reversed([proxy for proxy in batch if proxy not in checked]))
+        logger.info(f"Validated {found} working proxies out of {len(checked)} tested")
+        return found
+    
+    def get_working_proxy(self) -> Optional[Dict]:
+        with self._lock:
+            if not self.working_proxies and not self.proxies:
+                self.fetch_free_proxies()  # validates a first batch itself
+            if not self.working_proxies:
+                self.validate_proxies()
+            
+            if self.working_proxies:
+                proxy = _choice(list(self.working_proxies))
+                return {'http': f'http://{proxy}', 'https': f'http://{proxy}'}
+            return None
     
     def mark_proxy_failed(self, proxy_dict: Dict):
         if proxy_dict and 'http' in proxy_dict:
             proxy = proxy_dict['http'].replace('http://', '')
-            if proxy in self.working_proxies:
-                self.working_proxies.remove(proxy)
-            self.failed_proxies.add(proxy)
+            with self._lock:
+                self.working_proxies.pop(proxy, None)
+                self._remember_failed(proxy)
+    
+    def _remember_failed(self, proxy: str):
+        self.failed_proxies[proxy] = None
+        self.failed_proxies.move_to_end(proxy)
+        if len(self.failed_proxies) > MAX_FAILED_PROXIES:
+            self.failed_proxies.popitem(last=False)
 
 class AdvancedAntiDetection:
-    USER_AGENTS = [
+    USER_AGENTS = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
-    ]
+    )
     
     @staticmethod
     def get_random_user_agent():
-        return random.choice(AdvancedAntiDetection.USER_AGENTS)
+        return _choice(AdvancedAntiDetection.USER_AGENTS)
+    
+    @staticmethod
+    def get_random_user_agents(n):
+        return _choices(AdvancedAntiDetection.USER_AGENTS, k=n)
     
     @staticmethod
     def human_delay(min_sec=2.0, max_sec=8.0):
-        time.sleep(random.uniform(min_sec, max_sec))
+        time.sleep(_uniform(min_sec, max_sec))
     
     @staticmethod
     def get_realistic_headers(referer=None):
@@ -1,29 +1,47 @@
 import random
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import List, Optional
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Bound once; these run for every request
+_choice = random.choice
+_choices = random.choices
+_uniform = random.uniform
 
 
 class AntiDetection:
     """Anti-detection utilities for web scraping"""
     
-    USER_AGENTS = [
+    USER_AGENTS = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
-    ]
+    )
+    
+    # Next free request slot per host, least recently used first
+    _host_slots: OrderedDict = OrderedDict()
+    _slot_lock = threading.Lock()
     
     @staticmethod
     def get_random_user_agent() -> str:
         """Get random user agent string"""
-        return random.choice(AntiDetection.USER_AGENTS)
+        return _choice(AntiDetection.USER_AGENTS)
+    
+    @staticmethod
+    def get_random_user_agents(n: int) -> List[str]:
+        """Draw n user agents at once, e.g. to fill a per-page pool"""
+        return _choices(AntiDetection.USER_AGENTS, k=n)
     
     @staticmethod
     def jitter_delay(base_delay: float = 3.0, min_delay: float = 2.0, 
                     max_delay: float = 7.0) -> float:
         """Add random jitter to delay"""
-        jittered = base_delay + random.uniform(-1, 2)
+        jittered = base_delay + _uniform(-1, 2)
         return max(min_delay, min(max_delay, jittered))
     
     @staticmethod
@@ -32,6 +50,26 @@ class AntiDetection:
         delay = AntiDetection.jitter_delay(base_delay)
         time.sleep(delay)
     
+    @staticmethod
+    def throttle(host: str, base_delay: float = 3.0):
+        """Wait for the host's next request slot, spacing slots by a jittered delay.
+        
+        Slots are reserved under a lock, so callers targeting the same host
+        queue up behind each other while other hosts proceed immediately.
+        """
+        slots = AntiDetection._host_slots
+        with AntiDetection._slot_lock:
+            now = time.monotonic()
+            slot = max(now, slots.get(host, now))
+            slots[host] = slot + AntiDetection.jitter_delay(base_delay)
+            slots.move_to_end(host)
+            # A slot in the past means no wait, same as having no entry
+            while slots and next(iter(slots.values())) <= now:
+                slots.popitem(last=False)
+        
+        if slot > now:
+            time.sleep(slot - now)
+    
     @staticmethod
     def get_headers(referer: Optional[str] = None) -> dict:
         """Generate realistic request headers"""
@@ -39,7 +77,8 @@ class AntiDetection:
             "User-Agent": AntiDetection.get_random_user_agent(),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
+            # Only advertise codings urllib3 can decode (br/zstd when their packages are installed)
+            "Accept-Encoding": ACCEPT_ENCODING,
             "DNT": "1",
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
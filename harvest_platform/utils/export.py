@@ -1,68 +1,104 @@
 import csv
-import json
-from typing import List, Dict
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
 import io
+from itertools import chain, islice
+from operator import itemgetter
+
+from . import fast_json
 
 
 class DataExporter:
     """Export leads to various formats"""
     
+    CSV_COLUMNS = ['id', 'business_name', 'city', 'state', 'phone', 
+                   'email', 'website', 'address', 'category', 'score', 'scraped_at']
+    
     @staticmethod
     def to_csv(leads: List[Dict], include_metadata: bool = False) -> str:
         """Export leads to CSV format"""
         if not leads:
             return ""
         
+        return "".join(DataExporter.iter_csv(leads, include_metadata))
+    
+    @staticmethod
+    def to_csv_stream(leads: Iterable[Dict], include_metadata: bool = False,
+                      rows_per_chunk: int = 500) -> Iterator[bytes]:
+        """Stream leads as UTF-8 CSV chunks, holding one chunk of rows at a time"""
+        for chunk in DataExporter.iter_csv(leads, include_metadata, rows_per_chunk):
+            yield chunk.encode('utf-8')
+    
+    @staticmethod
+    def iter_csv(leads: Iterable[Dict], include_metadata: bool = False,
+                 rows_per_chunk: int = 500) -> Iterator[str]:
+        """Yield CSV text: the header, then rows_per_chunk rows per chunk"""
         output = io.StringIO()
         
-        base_columns = ['id', 'business_name', 'city', 'state', 'phone', 
-                       'email', 'website', 'address', 'category', 'score', 'scraped_at']
-        
+        base_columns = list(DataExporter.CSV_COLUMNS)
         if include_metadata:
             base_columns.append('metadata')
         
-        writer = csv.DictWriter(output, fieldnames=base_columns, extrasaction='ignore')
-        writer.writeheader()
+        writer = csv.writer(output)
+        writer.writerow(base_columns)
+        get_row = itemgetter(*DataExporter.CSV_COLUMNS)
         
-        for lead in leads:
-            row = {k: lead.get(k, '') for k in base_columns}
+        for idx, lead in enumerate(leads, 1):
+            try:
+                row = get_row(lead)
+            except KeyError:
+                row = tuple(lead.get(k, '') for k in DataExporter.CSV_COLUMNS)
             
-            if include_metadata and 'metadata' in lead:
-                row['metadata'] = json.dumps(lead['metadata'])
+            if include_metadata:
+                row += (fast_json.dumps(lead['metadata']) if 'metadata' in lead else '',)
             
             writer.writerow(row)
+            
+            if idx % rows_per_chunk == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
         
-        return output.getvalue()
+        if output.tell():
+            yield output.getvalue()
     
     @staticmethod
     def to_json(leads: List[Dict], pretty: bool = True) -> str:
-        """Export leads to JSON format"""
-        for lead in leads:
-            if 'scraped_at' in lead and isinstance(lead['scraped_at'], datetime):
-                lead['scraped_at'] = lead['scraped_at'].isoformat()
+        """Export leads to JSON format; datetimes are written as ISO-8601"""
+        return fast_json.dumps(leads, indent=pretty)
+    
+    @staticmethod
+    def to_json_stream(leads: Iterable[Dict], leads_per_chunk: int = 500) -> Iterator[bytes]:
+        """Stream leads as a pretty-printed JSON array in UTF-8 chunks"""
+        parts = ['[']
+        separator = '\n  '
+        
+        for idx, lead in enumerate(leads, 1):
+            item = fast_json.dumps(lead, indent=True)
+            parts.append(separator + item.replace('\n', '\n  '))
+            separator = ',\n  '
+            
+            if idx % leads_per_chunk == 0:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
         
-        if pretty:
-            return json.dumps(leads, indent=2, ensure_ascii=False)
-        return json.dumps(leads, ensure_ascii=False)
+        parts.append(']' if separator == '\n  ' else '\n]')
+        yield ''.join(parts).encode('utf-8')
     
     @staticmethod
-    def to_excel_buffer(leads: List[Dict]):
-        """Export to Excel format"""
+    def to_excel_buffer(leads: Iterable[Dict], width_sample: int = 100):
+        """Export to Excel format, streaming rows through a write-only workbook"""
         try:
             import openpyxl
             from openpyxl.utils import get_column_letter
             
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Leads"
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("Leads")
             
             headers = ['ID', 'Business Name', 'City', 'State', 'Phone', 
                       'Email', 'Website', 'Address', 'Category', 'Score', 'Scraped At']
-            ws.append(headers)
             
-            for lead in leads:
-                ws.append([
+            rows = (
+                (
                     lead.get('id', ''),
                     lead.get('business_name', ''),
                     lead.get('city', ''),
@@ -74,19 +110,19 @@ class DataExporter:
                     lead.get('category', ''),
                     lead.get('score', ''),
                     str(lead.get('scraped_at', ''))
-                ])
+                )
+                for lead in leads
+            )
+            
+            # Write-only sheets need widths before any row, so fit them to the first rows
+            sample = list(islice(rows, width_sample))
+            for idx, column in enumerate(zip(headers, *sample), 1):
+                max_length = max(len(str(value)) for value in column if value is not None)
+                ws.column_dimensions[get_column_letter(idx)].width = min(max_length + 2, 50)
             
-            for column in ws.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            ws.append(headers)
+            for row in chain(sample, rows):
+                ws.append(row)
             
             buffer = io.BytesIO()
             wb.save(buffer)
@@ -0,0 +1,43 @@
+"""JSON helpers backed by orjson when available, stdlib json otherwise"""
+
+import json
+from datetime import date, time
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch either
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> str:
+    """Encode dates and times as ISO-8601, as orjson does natively"""
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, optionally indented by two spaces"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default).encode('utf-8')
+    # Compact like orjson
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False,
+                      default=_default).encode('utf-8')
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string, optionally indented by two spaces"""
+    return dumpb(obj, indent).decode('utf-8')
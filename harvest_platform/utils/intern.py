@@ -0,0 +1,20 @@
+"""Bounded interning for the low-cardinality strings scraped into every lead"""
+
+from typing import Dict, Optional
+
+# Pool stops growing here so a scrape of unique values cannot hold memory forever
+MAX_INTERNED = 50_000
+
+_pool: Dict[str, str] = {}
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Return the pooled copy of value, pooling it while there is room"""
+    if value is None:
+        return None
+    pooled = _pool.get(value)
+    if pooled is not None:
+        return pooled
+    if len(_pool) < MAX_INTERNED:
+        return _pool.setdefault(value, value)
+    return value
@@ -0,0 +1,29 @@
+"""Numba-compiled kernel for LeadScorer.score_leads, when numba is installed"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+HAS_NUMBA = njit is not None
+
+if HAS_NUMBA:
+    @njit(cache=True, parallel=True)
+    def score_kernel(flags, weights):
+        """Weighted sum of each row's true flags, clamped to 100"""
+        n, m = flags.shape
+        scores = np.empty(n, np.int16)
+        for i in prange(n):
+            total = 0
+            for j in range(m):
+                if flags[i, j]:
+                    total += weights[j]
+            scores[i] = min(total, 100)
+        return scores
+    
+    # Compile (or load from the on-disk cache) now rather than on the first real batch
+    score_kernel(np.zeros((1, 1), dtype=np.bool_), np.zeros(1, dtype=np.int16))
+else:
+    score_kernel = None